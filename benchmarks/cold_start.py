@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DESCRIPTION = """
+Measure the INIT duration (handler module import) of each function in a fresh interpreter
+and exit non-zero when the median exceeds the function's budget
+"""
+
+# median milliseconds allowed to import each handler, including Powertools and X-Ray patching
+BUDGETS_MS: Dict[str, float] = {
+    "regional": 250,
+    "sso_assignment": 200,
+    "service_catalog_portfolio": 250,
+}
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import account_setup.lambda_handler
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"import_ms": elapsed, "boto3": "boto3" in sys.modules}))
+"""
+
+
+def measure(function: str) -> Dict[str, object]:
+    code_uri = ROOT / "src" / function
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(code_uri),
+        "PYTHONDONTWRITEBYTECODE": "1",
+        # look like the Lambda runtime so the Tracer patches botocore as it does in production
+        "LAMBDA_TASK_ROOT": str(code_uri),
+        "AWS_LAMBDA_FUNCTION_NAME": function,
+        "AWS_REGION": "us-east-1",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "POWERTOOLS_SERVICE_NAME": function,
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=code_uri,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per function")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every budget, e.g. for slow CI")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for function, budget in BUDGETS_MS.items():
+        measure(function)  # warm the filesystem cache and compile bytecode for the dependencies
+        samples = [measure(function) for _ in range(args.runs)]
+        median = statistics.median(float(sample["import_ms"]) for sample in samples)
+        limit = budget * args.budget_scale
+        status = "ok" if median <= limit else "OVER BUDGET"
+        failed = failed or median > limit
+        print(
+            f"{function:<28} median {median:7.1f} ms  budget {limit:7.1f} ms  "
+            f"boto3 at init: {samples[0]['boto3']!s:<5}  {status}"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,553 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import argparse
+from collections import Counter
+import json
+import os
+from pathlib import Path
+import resource
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINES = Path(__file__).with_name("baselines.json")
+
+DESCRIPTION = """
+Run each handler against an in-process stand-in for the AWS APIs, with injected per-call latency,
+and compare wall time, API calls per operation and peak memory with the stored baselines
+"""
+
+# size of the stand-in organization
+DEFAULT_SIZES: Dict[str, int] = {
+    "accounts": 3000,
+    "groups": 500,
+    "organization_groups": 25,
+    "permission_sets": 300,
+    "roles": 5000,
+    "subnets": 16,
+    "regions": 6,
+    "portfolios": 12,
+    "portfolio_permission_sets": 8,
+}
+
+DEFAULT_LATENCY_MS = 20.0
+
+# scenario name -> function directory under src/
+SCENARIOS: Dict[str, str] = {
+    "regional": "regional",
+    "sso_create_group": "sso_assignment",
+    "sso_new_account": "sso_assignment",
+    "service_catalog_portfolio": "service_catalog_portfolio",
+}
+
+# each handler runs once on a cold start and once more in the same process
+INVOCATIONS = ["cold", "warm"]
+
+RESULT_MARKER = "BENCHMARK_RESULT "
+
+REGION_NAMES = [
+    "us-east-1",
+    "us-east-2",
+    "us-west-1",
+    "us-west-2",
+    "eu-west-1",
+    "eu-west-2",
+    "eu-west-3",
+    "eu-central-1",
+    "eu-north-1",
+    "ap-south-1",
+    "ap-northeast-1",
+    "ap-northeast-2",
+    "ap-northeast-3",
+    "ap-southeast-1",
+    "ap-southeast-2",
+    "ca-central-1",
+    "sa-east-1",
+]
+
+ACCOUNT_ID = "111111111111"
+EXECUTION_ROLE_ARN = f"arn:aws:iam::{ACCOUNT_ID}:role/AWSControlTowerExecution"
+INSTANCE_ARN = "arn:aws:sso:::instance/ssoins-1111111111111111"
+IDENTITY_STORE_ID = "d-1111111111"
+
+
+# --- stand-in AWS backend, only used in the child process --------------------------------------
+
+
+class FakeAws:
+    """
+    Answers every client call in process after sleeping for the configured latency
+    """
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.lock = threading.Lock()
+        self.operations: Dict[str, Callable[[Dict[str, Any], str], Dict[str, Any]]] = {}
+
+    def install(self) -> None:
+        import botocore.session
+
+        create_client = botocore.session.Session.create_client
+        fake = self
+
+        def create_fake_client(session: Any, *args: Any, **kwargs: Any) -> Any:
+            client = create_client(session, *args, **kwargs)
+            client.meta.events.register("before-parameter-build.*.*", fake._keep_params)
+            client.meta.events.register_first("before-call.*.*", fake._respond)
+            return client
+
+        botocore.session.Session.create_client = create_fake_client
+
+        try:
+            from aiobotocore.session import AioSession
+        except ImportError:
+            return
+
+        create_async_client = AioSession._create_client
+
+        async def create_fake_async_client(session: Any, *args: Any, **kwargs: Any) -> Any:
+            client = await create_async_client(session, *args, **kwargs)
+            client.meta.events.register("before-parameter-build.*.*", fake._keep_params)
+            client.meta.events.register_first("before-call.*.*", fake._respond_async)
+            return client
+
+        AioSession._create_client = create_fake_async_client
+
+    @staticmethod
+    def _keep_params(params: Dict[str, Any], context: Dict[str, Any], **kwargs: Any) -> None:
+        context["benchmark_params"] = dict(params)
+
+    def _respond(self, model: Any, context: Dict[str, Any], **kwargs: Any) -> Any:
+        time.sleep(self.latency)
+        return self._answer(model, context)
+
+    async def _respond_async(self, model: Any, context: Dict[str, Any], **kwargs: Any) -> Any:
+        import asyncio
+
+        await asyncio.sleep(self.latency)
+        return self._answer(model, context)
+
+    def _answer(self, model: Any, context: Dict[str, Any]) -> Any:
+        from botocore import xform_name
+        from botocore.awsrequest import AWSResponse
+
+        name = xform_name(model.name)
+
+        with self.lock:
+            self.calls[name] += 1
+            operation = self.operations.get(name)
+            response = operation(context.get("benchmark_params", {}), context.get("client_region")) if operation else {}
+
+        return AWSResponse(url="https://localhost", status_code=200, headers={}, raw=None), response
+
+
+def page(
+    items: List[Any],
+    params: Dict[str, Any],
+    key: str,
+    token: str = "NextToken",
+    limit: str = "MaxResults",
+    default_limit: int = 100,
+    next_token: Optional[str] = None,
+) -> Dict[str, Any]:
+    start = int(params.get(token) or 0)
+    size = int(params.get(limit) or default_limit)
+    response: Dict[str, Any] = {key: items[start : start + size]}
+    if start + size < len(items):
+        response[next_token or token] = str(start + size)
+    return response
+
+
+def credentials(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+    from datetime import datetime, timedelta, timezone
+
+    return {
+        "Credentials": {
+            "AccessKeyId": "ASIABENCHMARK",
+            "SecretAccessKey": "secret",
+            "SessionToken": "token",
+            "Expiration": datetime.now(timezone.utc) + timedelta(hours=1),
+        }
+    }
+
+
+def regional_backend(fake: FakeAws, sizes: Dict[str, int]) -> Dict[str, Any]:
+    regions = REGION_NAMES[: sizes["regions"]]
+    default_vpcs: Set[str] = set(regions)
+    enabled: Set[tuple] = set()
+    ecs_settings: Dict[str, Dict[str, str]] = {region: {} for region in regions}
+
+    def describe_vpcs(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        if region not in default_vpcs:
+            return {"Vpcs": []}
+        return {"Vpcs": [{"VpcId": f"vpc-{region}", "IsDefault": True, "DhcpOptionsId": f"dopt-{region}"}]}
+
+    def delete_vpc(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        default_vpcs.discard(region)
+        return {}
+
+    def subnets(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        return {"Subnets": [{"SubnetId": f"subnet-{i:02d}"} for i in range(sizes["subnets"])]}
+
+    def network_acls(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        associations = [{"SubnetId": f"subnet-{i:02d}"} for i in range(sizes["subnets"])]
+        return {"NetworkAcls": [{"NetworkAclId": "acl-default", "IsDefault": True, "Associations": associations}]}
+
+    def route_tables(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        main = {"Main": True, "RouteTableAssociationId": "rtbassoc-main"}
+        return {"RouteTables": [{"RouteTableId": "rtb-main", "Associations": [main]}]}
+
+    def setting(name: str, key: str, off: Any, on: Any) -> Callable[[Dict[str, Any], str], Dict[str, Any]]:
+        return lambda params, region: {key: on if (name, region) in enabled else off}
+
+    def enable(name: str) -> Callable[[Dict[str, Any], str], Dict[str, Any]]:
+        def operation(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+            enabled.add((name, region))
+            return {}
+
+        return operation
+
+    def list_account_settings(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        return {"settings": [{"name": name, "value": value} for name, value in ecs_settings[region].items()]}
+
+    def put_account_setting_default(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        ecs_settings[region][params["name"]] = params["value"]
+        return {}
+
+    fake.operations.update(
+        assume_role=credentials,
+        describe_vpcs=describe_vpcs,
+        delete_vpc=delete_vpc,
+        describe_subnets=subnets,
+        describe_network_acls=network_acls,
+        describe_route_tables=route_tables,
+        describe_internet_gateways=lambda params, region: {"InternetGateways": [{"InternetGatewayId": "igw-1"}]},
+        describe_security_groups=lambda params, region: {
+            "SecurityGroups": [{"GroupId": "sg-default", "GroupName": "default"}]
+        },
+        get_snapshot_block_public_access_state=setting("snapshot", "State", "unblocked", "block-all-sharing"),
+        get_image_block_public_access_state=setting(
+            "image", "ImageBlockPublicAccessState", "unblocked", "block-new-sharing"
+        ),
+        get_ebs_encryption_by_default=setting("ebs", "EbsEncryptionByDefault", False, True),
+        get_service_setting=lambda params, region: {
+            "ServiceSetting": {"SettingValue": "Disable" if ("ssm", region) in enabled else "Enable"}
+        },
+        enable_snapshot_block_public_access=enable("snapshot"),
+        enable_image_block_public_access=enable("image"),
+        enable_ebs_encryption_by_default=enable("ebs"),
+        update_service_setting=enable("ssm"),
+        list_account_settings=list_account_settings,
+        put_account_setting_default=put_account_setting_default,
+    )
+
+    return {"AccountId": ACCOUNT_ID, "ExecutionRoleArn": EXECUTION_ROLE_ARN, "Regions": regions}
+
+
+def permission_set_name(index: int) -> str:
+    return f"PermissionSet{index:03d}"
+
+
+def sso_backend(fake: FakeAws, sizes: Dict[str, int]) -> None:
+    accounts = [
+        {"Id": f"{i:012d}", "Name": f"Account{i:04d}", "Email": f"account{i:04d}@example.com", "Status": "ACTIVE"}
+        for i in range(sizes["accounts"])
+    ]
+    permission_set_arns = [
+        f"arn:aws:sso:::permissionSet/ssoins-1111111111111111/ps-{i:016d}" for i in range(sizes["permission_sets"])
+    ]
+    groups = [
+        {"GroupId": f"group-{i:04d}", "DisplayName": f"AWS-O-{permission_set_name(i)}"}
+        for i in range(sizes["organization_groups"])
+    ] + [
+        {"GroupId": f"group-{i:04d}", "DisplayName": f"Team{i:04d}"}
+        for i in range(sizes["organization_groups"], sizes["groups"])
+    ]
+
+    request_ids = iter(range(10**9))
+
+    def create_account_assignment(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        request_id = f"{next(request_ids):036d}"
+        return {"AccountAssignmentCreationStatus": {"Status": "IN_PROGRESS", "RequestId": request_id}}
+
+    fake.operations.update(
+        list_instances=lambda params, region: {
+            "Instances": [{"InstanceArn": INSTANCE_ARN, "IdentityStoreId": IDENTITY_STORE_ID}]
+        },
+        list_accounts=lambda params, region: page(accounts, params, "Accounts", default_limit=20),
+        describe_account=lambda params, region: {"Account": accounts[int(params["AccountId"])]},
+        list_permission_sets=lambda params, region: page(permission_set_arns, params, "PermissionSets"),
+        describe_permission_set=lambda params, region: {
+            "PermissionSet": {"Name": permission_set_name(permission_set_arns.index(params["PermissionSetArn"]))}
+        },
+        list_groups=lambda params, region: page(groups, params, "Groups"),
+        create_account_assignment=create_account_assignment,
+        describe_account_assignment_creation_status=lambda params, region: {
+            "AccountAssignmentCreationStatus": {"Status": "SUCCEEDED"}
+        },
+    )
+
+
+def sso_create_group_backend(fake: FakeAws, sizes: Dict[str, int]) -> Dict[str, Any]:
+    sso_backend(fake, sizes)
+    # the last account and permission set, so every listing is read to the end
+    group_name = f"AWS-A-Account{sizes['accounts'] - 1:04d}-{permission_set_name(sizes['permission_sets'] - 1)}"
+    return {
+        "eventName": "CreateGroup",
+        "requestParameters": {"identityStoreId": IDENTITY_STORE_ID},
+        "responseElements": {"group": {"groupId": "group-new", "groupName": group_name}},
+    }
+
+
+def sso_new_account_backend(fake: FakeAws, sizes: Dict[str, int]) -> Dict[str, Any]:
+    sso_backend(fake, sizes)
+    return {"AccountId": f"{sizes['accounts'] - 1:012d}"}
+
+
+def service_catalog_backend(fake: FakeAws, sizes: Dict[str, int]) -> Dict[str, Any]:
+    sso_path = "/aws-reserved/sso.amazonaws.com/"
+    roles = [
+        {
+            "RoleName": f"AWSReservedSSO_{permission_set_name(i)}_{i:016x}",
+            "Path": sso_path,
+            "Arn": f"arn:aws:iam::{ACCOUNT_ID}:role{sso_path}AWSReservedSSO_{permission_set_name(i)}_{i:016x}",
+        }
+        for i in range(sizes["permission_sets"])
+    ] + [
+        {"RoleName": f"Role{i:05d}", "Path": "/", "Arn": f"arn:aws:iam::{ACCOUNT_ID}:role/Role{i:05d}"}
+        for i in range(sizes["roles"] - sizes["permission_sets"])
+    ]
+    accepted: Set[str] = set()
+    principals: Dict[str, Dict[str, str]] = {}
+
+    def list_roles(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        matching = [role for role in roles if role["Path"].startswith(params.get("PathPrefix", "/"))]
+        response = page(matching, params, "Roles", token="Marker", limit="MaxItems")
+        response["IsTruncated"] = "Marker" in response
+        return response
+
+    def accept_portfolio_share(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        accepted.add(params["PortfolioId"])
+        return {}
+
+    def list_principals_for_portfolio(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        items = [
+            {"PrincipalARN": arn, "PrincipalType": principal_type}
+            for arn, principal_type in principals.get(params["PortfolioId"], {}).items()
+        ]
+        return page(items, params, "Principals", token="PageToken", limit="PageSize", next_token="NextPageToken")
+
+    def associate_principal_with_portfolio(params: Dict[str, Any], region: str) -> Dict[str, Any]:
+        principals.setdefault(params["PortfolioId"], {})[params["PrincipalARN"]] = params["PrincipalType"]
+        return {}
+
+    fake.operations.update(
+        assume_role=credentials,
+        list_roles=list_roles,
+        list_accepted_portfolio_shares=lambda params, region: {
+            "PortfolioDetails": [{"Id": portfolio_id} for portfolio_id in sorted(accepted)]
+        },
+        accept_portfolio_share=accept_portfolio_share,
+        list_principals_for_portfolio=list_principals_for_portfolio,
+        associate_principal_with_portfolio=associate_principal_with_portfolio,
+    )
+
+    return {"AccountId": ACCOUNT_ID, "ExecutionRoleArn": EXECUTION_ROLE_ARN}
+
+
+BACKENDS: Dict[str, Callable[[FakeAws, Dict[str, int]], Dict[str, Any]]] = {
+    "regional": regional_backend,
+    "sso_create_group": sso_create_group_backend,
+    "sso_new_account": sso_new_account_backend,
+    "service_catalog_portfolio": service_catalog_backend,
+}
+
+
+class FakeContext:
+    function_name = "benchmark"
+    memory_limit_in_mb = 128
+    invoked_function_arn = f"arn:aws:lambda:us-east-1:{ACCOUNT_ID}:function:benchmark"
+    aws_request_id = "00000000-0000-0000-0000-000000000000"
+
+    def get_remaining_time_in_millis(self) -> int:
+        return 300_000
+
+
+def run_child(scenario: str, latency: float, sizes: Dict[str, int]) -> Dict[str, Any]:
+    fake = FakeAws(latency)
+    fake.install()
+    event = BACKENDS[scenario](fake, sizes)
+
+    from account_setup.lambda_handler import handler
+
+    invocations = []
+    for invocation in INVOCATIONS:
+        fake.calls.clear()
+        start = time.perf_counter()
+        try:
+            handler(json.loads(json.dumps(event)), FakeContext())
+            error = None
+        except Exception as exception:
+            error = f"{type(exception).__name__}: {exception}"
+        invocations.append(
+            {
+                "invocation": invocation,
+                "wall_ms": round((time.perf_counter() - start) * 1000, 1),
+                "calls": dict(sorted(fake.calls.items())),
+                "error": error,
+            }
+        )
+
+    # kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"invocations": invocations, "peak_rss_mb": round(peak_rss_mb, 1)}
+
+
+# --- driver ---------------------------------------------------------------------------------------
+
+
+def measure(scenario: str, latency_ms: float, sizes: Dict[str, int], async_mode: bool = False) -> Dict[str, Any]:
+    function = SCENARIOS[scenario]
+    code_uri = ROOT / "src" / function
+    env = {
+        **os.environ,
+        # keeps optional packages installed outside site-packages, ex. aiobotocore for --async
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(code_uri), os.environ.get("PYTHONPATH")])),
+        "AWS_ACCESS_KEY_ID": "AKIABENCHMARK",
+        "AWS_SECRET_ACCESS_KEY": "secret",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_REGION": "us-east-1",
+        "POWERTOOLS_SERVICE_NAME": function,
+        "POWERTOOLS_TRACE_DISABLED": "1",
+        "POWERTOOLS_LOG_LEVEL": "ERROR",
+        "PORTFOLIO_IDS": ",".join(f"port-{i:012d}" for i in range(sizes["portfolios"])),
+        "PERMISSION_SET_NAMES": ",".join(permission_set_name(i) for i in range(sizes["portfolio_permission_sets"])),
+        "ASYNC_MODE": "true" if async_mode else "false",
+    }
+    config = json.dumps({"scenario": scenario, "latency_ms": latency_ms, "sizes": sizes})
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", config],
+        cwd=code_uri,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    for line in reversed(output.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER) :])
+    raise RuntimeError(f"No result from {scenario}:\n{output}")
+
+
+def compare(scenario: str, result: Dict[str, Any], baseline: Optional[Dict[str, Any]], tolerance: float) -> bool:
+    """
+    Print the result next to its baseline, returning False on a regression
+    """
+    ok = True
+    for index, invocation in enumerate(result["invocations"]):
+        base = baseline["invocations"][index] if baseline else None
+        total = sum(invocation["calls"].values())
+        line = f"{scenario:<28} {invocation['invocation']:<5} {invocation['wall_ms']:9.1f} ms {total:6d} calls"
+        if base:
+            base_total = sum(base["calls"].values())
+            change = (invocation["wall_ms"] - base["wall_ms"]) / base["wall_ms"] if base["wall_ms"] else 0.0
+            line += f"  (baseline {base['wall_ms']:9.1f} ms {change:+6.0%}, {base_total:6d} calls)"
+            if change > tolerance:
+                ok = False
+                line += "  SLOWER"
+        if invocation["error"]:
+            line += f"  ERROR {invocation['error']}"
+        print(line)
+
+        if base:
+            for operation in sorted(invocation["calls"].keys() | base["calls"].keys()):
+                count, base_count = invocation["calls"].get(operation, 0), base["calls"].get(operation, 0)
+                if count != base_count:
+                    print(f"{'':<34} {operation:<48} {base_count:6d} -> {count:6d}")
+                if count > base_count:
+                    ok = False
+
+    rss = f"{'':<34} peak RSS {result['peak_rss_mb']:.1f} MB"
+    if baseline:
+        rss += f" (baseline {baseline['peak_rss_mb']:.1f} MB)"
+    print(rss)
+    return ok
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="default: every scenario")
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS, help="added to every API call")
+    parser.add_argument("--size", action="append", default=[], metavar="NAME=COUNT", help="override a data size")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed wall time increase, 0.5 is 50%%")
+    parser.add_argument("--update-baselines", action="store_true", help=f"write the results to {BASELINES.name}")
+    parser.add_argument("--async", dest="async_mode", action="store_true", help="run the handlers in ASYNC_MODE")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        config = json.loads(args.child)
+        result = run_child(config["scenario"], config["latency_ms"] / 1000, config["sizes"])
+        print(RESULT_MARKER + json.dumps(result))
+        return 0
+
+    if args.async_mode and args.update_baselines:
+        parser.error("baselines are measured with threads, compare --async runs against them instead")
+
+    sizes = dict(DEFAULT_SIZES)
+    for override in args.size:
+        name, count = override.split("=", 1)
+        if name not in sizes:
+            parser.error(f"unknown size {name}, expected one of {', '.join(sizes)}")
+        sizes[name] = int(count)
+
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    # baselines are only comparable when measured with the same latency and data sizes
+    comparable = baselines.get("latency_ms") == args.latency_ms and baselines.get("sizes") == sizes
+    if baselines and not comparable:
+        print(f"{BASELINES.name} was measured with other settings, not comparing")
+
+    results = {}
+    ok = True
+    for scenario in args.scenario or SCENARIOS:
+        results[scenario] = measure(scenario, args.latency_ms, sizes, async_mode=args.async_mode)
+        baseline = baselines.get("scenarios", {}).get(scenario) if comparable else None
+        ok = compare(scenario, results[scenario], baseline, args.tolerance) and ok
+        ok = ok and not any(invocation["error"] for invocation in results[scenario]["invocations"])
+
+    if args.update_baselines:
+        scenarios = {**baselines.get("scenarios", {}), **results} if comparable else results
+        BASELINES.write_text(
+            json.dumps({"latency_ms": args.latency_ms, "sizes": sizes, "scenarios": scenarios}, indent=2) + "\n"
+        )
+        print(f"Updated {BASELINES.name}")
+        return 0
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
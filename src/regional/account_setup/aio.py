@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from collections import OrderedDict
+from importlib.util import find_spec
+import os
+from typing import Any, Awaitable, Hashable, Optional, Tuple, TypeVar, TYPE_CHECKING
+
+from aws_lambda_powertools import Logger
+
+from account_setup.clients import MAX_CACHED_CLIENTS, get_default_session
+from account_setup.instrumentation import API_METRICS
+from account_setup.throttling import RATE_LIMITER
+
+if TYPE_CHECKING:
+    import asyncio
+
+    import boto3
+
+logger = Logger(child=True)
+
+__all__ = ["AsyncClientFactory", "async_enabled", "get_async_client", "run_async"]
+
+T = TypeVar("T")
+
+# run the fan-outs on an event loop instead of threads, needs the optional aiobotocore package
+ASYNC_MODE = os.getenv("ASYNC_MODE", "false").lower() == "true"
+
+# connections shared by every coroutine using a client
+MAX_ASYNC_CONNECTIONS = int(os.getenv("MAX_ASYNC_CONNECTIONS", "50"))
+
+
+def async_enabled() -> bool:
+    """
+    Whether ASYNC_MODE is set and aiobotocore is installed
+    """
+    if not ASYNC_MODE:
+        return False
+    if find_spec("aiobotocore") is None:
+        logger.warning("ASYNC_MODE is set but aiobotocore is not installed, using threads")
+        return False
+    return True
+
+
+class AsyncClientFactory:
+    """
+    Least recently used cache of aiobotocore clients, keyed by credentials, service and region
+
+    aiohttp connections belong to the event loop that opened them, so every invocation runs on the same
+    event loop and the clients keep their connection pools across warm invocations.
+    """
+
+    def __init__(self, maxsize: int = MAX_CACHED_CLIENTS, max_pool_connections: int = MAX_ASYNC_CONNECTIONS) -> None:
+        self.maxsize = maxsize
+        self.max_pool_connections = max_pool_connections
+        self._session: Any = None
+        self._config: Any = None
+        self._loop: Optional["asyncio.AbstractEventLoop"] = None
+        self._lock: Optional["asyncio.Lock"] = None
+        self._clients: OrderedDict[Tuple[Hashable, ...], Any] = OrderedDict()
+
+    @property
+    def loop(self) -> "asyncio.AbstractEventLoop":
+        if self._loop is None:
+            import asyncio
+
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+    def _open(self) -> None:
+        if self._session is None:
+            import asyncio
+
+            from aiobotocore.config import AioConfig
+            from aiobotocore.session import get_session
+
+            # the session and its loaded service models are reused across invocations
+            self._session = get_session()
+            # share the service models already parsed for the boto3 clients instead of loading them twice
+            self._session.register_component("data_loader", get_default_session()._session.get_component("data_loader"))
+            # retries are handled by the shared rate limiter
+            self._config = AioConfig(
+                max_pool_connections=self.max_pool_connections,
+                retries={"mode": "standard", "total_max_attempts": 1},
+            )
+            self._lock = asyncio.Lock()
+
+    async def client(self, session: "boto3.Session", service_name: str, region_name: Optional[str] = None) -> Any:
+        if self._lock is None:
+            raise RuntimeError("Async clients are only available inside run_async()")
+
+        async with self._lock:
+            session_credentials = session.get_credentials()
+            if session_credentials is None:
+                raise RuntimeError("No credentials found for the boto3 session")
+            credentials = session_credentials.get_frozen_credentials()
+            region_name = region_name or session.region_name
+            key = (credentials.access_key, service_name, region_name)
+
+            client = self._clients.get(key)
+            if client is None:
+                client = await self._session.create_client(
+                    service_name,
+                    region_name=region_name,
+                    aws_access_key_id=credentials.access_key,
+                    aws_secret_access_key=credentials.secret_key,
+                    aws_session_token=credentials.token,
+                    config=self._config,
+                ).__aenter__()
+                RATE_LIMITER.register_async(client)
+                API_METRICS.register(client)
+                self._clients[key] = client
+
+            self._clients.move_to_end(key)
+            return client
+
+    async def _evict(self, maxsize: int) -> None:
+        while len(self._clients) > maxsize:
+            # closes the evicted client's connection pool
+            _, client = self._clients.popitem(last=False)
+            await client.close()
+
+    def clear(self) -> None:
+        if self._clients:
+            self.loop.run_until_complete(self._evict(0))
+
+    def run(self, main: Awaitable[T]) -> T:
+        """
+        Run a coroutine on the execution environment's event loop
+        """
+        self._open()
+        try:
+            return self.loop.run_until_complete(main)
+        finally:
+            # clients are only closed between invocations, never while a coroutine may still use them
+            self.loop.run_until_complete(self._evict(self.maxsize))
+
+
+# shared by every invocation in the execution environment
+ASYNC_CLIENTS = AsyncClientFactory()
+
+
+async def get_async_client(session: "boto3.Session", service_name: str, region_name: Optional[str] = None) -> Any:
+    """
+    Return a cached client for the session's credentials, only from inside run_async()
+    """
+    return await ASYNC_CLIENTS.client(session, service_name, region_name=region_name)
+
+
+def run_async(main: Awaitable[T]) -> T:
+    return ASYNC_CLIENTS.run(main)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aws_lambda_powertools import Logger
+
+from account_setup.concurrency import gather_all, run_all
+from account_setup.resources import AsyncEC2, AsyncECS, AsyncSSM, EC2, ECS, SSM
+from account_setup.resources.ec2 import VpcInventory
+from account_setup.resources.ecs import DEFAULT_ACCOUNT_SETTINGS
+
+logger = Logger(child=True)
+
+__all__ = [
+    "RegionCompliance",
+    "delete_default_vpc",
+    "delete_default_vpc_async",
+    "plan_region",
+    "plan_region_async",
+    "probe_region",
+    "probe_region_async",
+]
+
+
+@dataclass
+class RegionCompliance:
+    """
+    Current state of the regional baseline, a read that failed is reported as non-compliant
+    """
+
+    default_vpc_deleted: bool = False
+    default_vpc: Optional[VpcInventory] = None  # the default VPC and its resources, reused to delete it
+    snapshot_block_public_access: bool = False
+    image_block_public_access: bool = False
+    ebs_encryption_by_default: bool = False
+    ssm_public_sharing_disabled: bool = False
+    ecs_settings: Optional[Dict[str, str]] = None  # effective settings, None if they could not be read
+
+    @property
+    def ecs_account_settings(self) -> bool:
+        if self.ecs_settings is None:
+            return False
+        return all(self.ecs_settings.get(name) == value for name, value in DEFAULT_ACCOUNT_SETTINGS.items())
+
+    def to_dict(self) -> Dict[str, bool]:
+        return {
+            "DefaultVpcDeleted": self.default_vpc_deleted,
+            "SnapshotBlockPublicAccess": self.snapshot_block_public_access,
+            "ImageBlockPublicAccess": self.image_block_public_access,
+            "EbsEncryptionByDefault": self.ebs_encryption_by_default,
+            "SsmPublicSharingDisabled": self.ssm_public_sharing_disabled,
+            "EcsAccountSettings": self.ecs_account_settings,
+        }
+
+
+def _read(name: str, read: Callable[[], Any]) -> Any:
+    try:
+        return read()
+    except Exception:
+        logger.exception(f"Unable to read {name}, assuming it is not compliant")
+        return None
+
+
+def probe_region(ec2: EC2, ecs: ECS, ssm: SSM, account_id: str) -> RegionCompliance:
+    """
+    Read the regional baseline settings concurrently without changing anything
+    """
+
+    def default_vpc() -> Any:
+        return ec2.get_default_vpc() or ""  # empty when there is no default VPC
+
+    reads: Dict[str, Callable[[], Any]] = {
+        "DefaultVpc": default_vpc,
+        "SnapshotBlockPublicAccess": ec2.get_snapshot_block_public_access_state,
+        "ImageBlockPublicAccess": ec2.get_image_block_public_access_state,
+        "EbsEncryptionByDefault": ec2.get_ebs_encryption_by_default,
+        "SsmPublicSharing": partial(ssm.get_public_sharing_permission, account_id),
+        "EcsAccountSettings": ecs.list_effective_settings,
+    }
+    state = run_all({name: partial(_read, name, read) for name, read in reads.items()})
+    return _compliance(ec2.region_name, state)
+
+
+def _compliance(region_name: str, state: Dict[str, Any]) -> RegionCompliance:
+    compliance = RegionCompliance(
+        default_vpc_deleted=state["DefaultVpc"] == "",
+        default_vpc=state["DefaultVpc"] or None,
+        snapshot_block_public_access=state["SnapshotBlockPublicAccess"] == "block-all-sharing",
+        image_block_public_access=state["ImageBlockPublicAccess"] == "block-new-sharing",
+        ebs_encryption_by_default=state["EbsEncryptionByDefault"] is True,
+        ssm_public_sharing_disabled=state["SsmPublicSharing"] == "Disable",
+        ecs_settings=state["EcsAccountSettings"],
+    )
+
+    logger.info(f"Regional baseline compliance in {region_name}", compliance=compliance.to_dict())
+    return compliance
+
+
+async def _read_async(name: str, read: Callable[[], Awaitable[Any]]) -> Any:
+    try:
+        return await read()
+    except Exception:
+        logger.exception(f"Unable to read {name}, assuming it is not compliant")
+        return None
+
+
+async def probe_region_async(ec2: AsyncEC2, ecs: AsyncECS, ssm: AsyncSSM, account_id: str) -> RegionCompliance:
+    """
+    Same as probe_region, with every read on the running event loop
+    """
+
+    async def default_vpc() -> Any:
+        return await ec2.get_default_vpc() or ""
+
+    reads: Dict[str, Callable[[], Awaitable[Any]]] = {
+        "DefaultVpc": default_vpc,
+        "SnapshotBlockPublicAccess": ec2.get_snapshot_block_public_access_state,
+        "ImageBlockPublicAccess": ec2.get_image_block_public_access_state,
+        "EbsEncryptionByDefault": ec2.get_ebs_encryption_by_default,
+        "SsmPublicSharing": partial(ssm.get_public_sharing_permission, account_id),
+        "EcsAccountSettings": ecs.list_effective_settings,
+    }
+    state = await gather_all({name: partial(_read_async, name, read) for name, read in reads.items()})
+    return _compliance(ec2.region_name, state)
+
+
+def delete_default_vpc(ec2: EC2, account_id: str, default_vpc: Optional[VpcInventory] = None) -> None:
+    region_name = ec2.region_name
+
+    default_vpc = default_vpc or ec2.get_default_vpc()
+    if default_vpc:
+        logger.info(f"Deleting default VPC {default_vpc.vpc_id} from {region_name} in {account_id}")
+        ec2.delete_vpc(default_vpc.vpc_id, default_vpc)
+    else:
+        logger.debug(f"No default VPC found in {region_name} in {account_id}")
+
+
+def plan_region(
+    ec2: EC2, ecs: ECS, ssm: SSM, account_id: str, compliance: RegionCompliance
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Return the independent steps that bring a region into compliance, keyed by step name
+    """
+    steps: Dict[str, Callable[[], Any]] = {}
+    if not compliance.default_vpc_deleted:
+        steps["DeleteDefaultVpc"] = partial(delete_default_vpc, ec2, account_id, compliance.default_vpc)
+    if not compliance.snapshot_block_public_access:
+        steps["SnapshotBlockPublicAccess"] = ec2.enable_snapshot_block_public_access
+    if not compliance.image_block_public_access:
+        steps["ImageBlockPublicAccess"] = ec2.enable_ami_block_public_access
+    if not compliance.ebs_encryption_by_default:
+        steps["EbsEncryptionByDefault"] = ec2.enable_ebs_encryption_by_default
+    if not compliance.ssm_public_sharing_disabled:
+        steps["DisableSsmPublicSharing"] = partial(ssm.disable_public_sharing, account_id)
+    if not compliance.ecs_account_settings:
+        steps["EcsAccountSettings"] = partial(ecs.put_account_setting_default, compliance.ecs_settings)
+    return steps
+
+
+async def delete_default_vpc_async(ec2: AsyncEC2, account_id: str, default_vpc: Optional[VpcInventory] = None) -> None:
+    region_name = ec2.region_name
+
+    default_vpc = default_vpc or await ec2.get_default_vpc()
+    if default_vpc:
+        logger.info(f"Deleting default VPC {default_vpc.vpc_id} from {region_name} in {account_id}")
+        await ec2.delete_vpc(default_vpc.vpc_id, default_vpc)
+    else:
+        logger.debug(f"No default VPC found in {region_name} in {account_id}")
+
+
+def plan_region_async(
+    ec2: AsyncEC2, ecs: AsyncECS, ssm: AsyncSSM, account_id: str, compliance: RegionCompliance
+) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    """
+    Same as plan_region, returning coroutine functions
+    """
+    steps: Dict[str, Callable[[], Awaitable[Any]]] = {}
+    if not compliance.default_vpc_deleted:
+        steps["DeleteDefaultVpc"] = partial(delete_default_vpc_async, ec2, account_id, compliance.default_vpc)
+    if not compliance.snapshot_block_public_access:
+        steps["SnapshotBlockPublicAccess"] = ec2.enable_snapshot_block_public_access
+    if not compliance.image_block_public_access:
+        steps["ImageBlockPublicAccess"] = ec2.enable_ami_block_public_access
+    if not compliance.ebs_encryption_by_default:
+        steps["EbsEncryptionByDefault"] = ec2.enable_ebs_encryption_by_default
+    if not compliance.ssm_public_sharing_disabled:
+        steps["DisableSsmPublicSharing"] = partial(ssm.disable_public_sharing, account_id)
+    if not compliance.ecs_account_settings:
+        steps["EcsAccountSettings"] = partial(ecs.put_account_setting_default, compliance.ecs_settings)
+    return steps
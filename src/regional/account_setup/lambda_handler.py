@@ -19,51 +19,231 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Dict, Any
+from functools import partial
+from typing import Awaitable, Callable, Dict, Any, List, TYPE_CHECKING
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from aws_lambda_powertools.utilities.validation import validator
-import boto3
 
-from account_setup.resources import EC2, ECS, STS
-from account_setup.schemas import INPUT
+from account_setup.aio import async_enabled, run_async
+from account_setup.clients import get_default_session
+from account_setup.compliance import plan_region, plan_region_async, probe_region, probe_region_async
+from account_setup.concurrency import TaskResult, gather_isolated, run_isolated
+from account_setup.instrumentation import api_metrics
+from account_setup.resources import AsyncEC2, AsyncECS, AsyncSSM, EC2, ECS, SSM, STS
+from account_setup.scheduler import PROBE, BulkScheduler
+from account_setup.schemas import validate_input
+from account_setup.throttling import set_deadline
+from account_setup.validation import validator
+
+if TYPE_CHECKING:
+    import boto3
 
 tracer = Tracer()
 logger = Logger()
 
+# regions processed at the same time by a single batch invocation
+MAX_REGION_WORKERS = 6
+
+
+def setup_region(ec2: EC2, ecs: ECS, ssm: SSM, account_id: str) -> Dict[str, TaskResult]:
+    """
+    Apply the regional baseline settings that are out of compliance, running the independent steps concurrently
+    """
+    region_name = ec2.region_name
+
+    compliance = probe_region(ec2, ecs, ssm, account_id)
+    steps = plan_region(ec2, ecs, ssm, account_id, compliance)
+
+    if not steps:
+        logger.info(f"Regional baseline already compliant in {region_name} in {account_id}")
+        return {}
+
+    logger.info(f"Applying regional baseline in {region_name} in {account_id}", steps=list(steps))
+    results = run_isolated(steps)
+
+    logger.info(
+        f"Regional baseline applied in {region_name} in {account_id}",
+        region=region_name,
+        steps={name: result.to_dict() for name, result in results.items()},
+    )
+    return results
+
+
+def setup_regions(
+    session: "boto3.Session", region_names: List[str], account_id: str
+) -> Dict[str, Dict[str, TaskResult]]:
+    """
+    Set up the regions on a bounded pool, clients are created up front as boto3 sessions are not thread-safe
+
+    A region that cannot be probed is reported as a failed Probe step without affecting the other regions.
+    """
+    results: Dict[str, Dict[str, TaskResult]] = {}
+
+    def setup(region_name: str, ec2: EC2, ecs: ECS, ssm: SSM) -> None:
+        results[region_name] = setup_region(ec2, ecs, ssm, account_id)
+
+    tasks: Dict[str, Callable[[], None]] = {
+        region_name: partial(
+            setup,
+            region_name,
+            EC2(session, region_name),
+            ECS(session, region_name),
+            SSM(session, region_name),
+        )
+        for region_name in region_names
+    }
+    return _region_results(run_isolated(tasks, max_workers=MAX_REGION_WORKERS), results)
+
+
+async def setup_region_async(ec2: AsyncEC2, ecs: AsyncECS, ssm: AsyncSSM, account_id: str) -> Dict[str, TaskResult]:
+    """
+    Same as setup_region, with every call on the running event loop
+    """
+    region_name = ec2.region_name
+
+    compliance = await probe_region_async(ec2, ecs, ssm, account_id)
+    steps = plan_region_async(ec2, ecs, ssm, account_id, compliance)
+
+    if not steps:
+        logger.info(f"Regional baseline already compliant in {region_name} in {account_id}")
+        return {}
+
+    logger.info(f"Applying regional baseline in {region_name} in {account_id}", steps=list(steps))
+    results = await gather_isolated(steps)
+
+    logger.info(
+        f"Regional baseline applied in {region_name} in {account_id}",
+        region=region_name,
+        steps={name: result.to_dict() for name, result in results.items()},
+    )
+    return results
+
 
-@validator(inbound_schema=INPUT)
+async def setup_regions_async(
+    session: "boto3.Session", region_names: List[str], account_id: str
+) -> Dict[str, Dict[str, TaskResult]]:
+    """
+    Set up every region on one event loop, each service shares one connection pool per region
+    """
+    results: Dict[str, Dict[str, TaskResult]] = {}
+
+    async def setup(region_name: str, ec2: AsyncEC2, ecs: AsyncECS, ssm: AsyncSSM) -> None:
+        results[region_name] = await setup_region_async(ec2, ecs, ssm, account_id)
+
+    tasks: Dict[str, Callable[[], Awaitable[None]]] = {
+        region_name: partial(
+            setup,
+            region_name,
+            AsyncEC2(session, region_name),
+            AsyncECS(session, region_name),
+            AsyncSSM(session, region_name),
+        )
+        for region_name in region_names
+    }
+    return _region_results(await gather_isolated(tasks), results)
+
+
+def _region_results(
+    outcomes: Dict[str, TaskResult], results: Dict[str, Dict[str, TaskResult]]
+) -> Dict[str, Dict[str, TaskResult]]:
+    """
+    Steps of every region in the requested order, a region that failed before its steps ran fails its Probe
+    """
+    return {
+        region_name: results[region_name] if outcome.succeeded else {PROBE: outcome}
+        for region_name, outcome in outcomes.items()
+    }
+
+
+def get_failed_steps(results: Dict[str, TaskResult]) -> List[str]:
+    return sorted(name for name, result in results.items() if not result.succeeded)
+
+
+def onboard_accounts(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Set up every region of many accounts, handing back the regions left when the invocation runs out of time
+    """
+    accounts = {account["AccountId"]: account["ExecutionRoleArn"] for account in event["Accounts"]}
+    pending = event.get("Pending")
+    if pending is None:
+        pending = {account_id: event["Regions"] for account_id in accounts}
+
+    report = BulkScheduler(get_default_session(), accounts).run(pending)
+
+    # failures of earlier invocations are carried over until every region is done
+    failed = event.get("Failed") or {}
+    for account_id, regions in report.failed.items():
+        failed.setdefault(account_id, {}).update(regions)
+
+    response = report.to_dict()
+    response["Failed"] = failed
+    response["FailedRegions"] = sum(len(regions) for regions in failed.values())
+    response["Complete"] = not report.pending
+    return response
+
+
+@validator(inbound_validator=validate_input)
 @tracer.capture_lambda_handler
 @logger.inject_lambda_context(log_event=True)
-def handler(event: Dict[str, Any], context: LambdaContext) -> None:
+@api_metrics
+def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    set_deadline(context)
+
+    # Bulk mode: many accounts in one invocation, called repeatedly until Complete
+    if "Accounts" in event:
+        return onboard_accounts(event)
+
     account_id = event["AccountId"]
-    region_name = event["Region"]
     execution_role_arn = event["ExecutionRoleArn"]
 
-    logger.append_keys(account_id=account_id, region=region_name)
+    logger.append_keys(account_id=account_id)
     tracer.put_annotation("AccountId", account_id)
-    tracer.put_annotation("Region", region_name)
 
-    session = boto3.Session()
+    # the default session and the assumed role session are reused across warm invocations
+    session = get_default_session()
 
     assumed_session = STS(session).assume_role(execution_role_arn)
 
-    ec2 = EC2(assumed_session, region_name)
-    default_vpc_id = ec2.get_default_vpc_id()
-    if default_vpc_id:
-        logger.info(f"Deleting default VPC {default_vpc_id} from {region_name} in {account_id}")
-        ec2.delete_vpc(default_vpc_id)
+    if "Region" in event:
+        region_name = event["Region"]
+        logger.append_keys(region=region_name)
+        tracer.put_annotation("Region", region_name)
+
+        if async_enabled():
+            steps = run_async(setup_regions_async(assumed_session, [region_name], account_id))[region_name]
+        else:
+            steps = setup_region(
+                EC2(assumed_session, region_name),
+                ECS(assumed_session, region_name),
+                SSM(assumed_session, region_name),
+                account_id,
+            )
+
+        failed = get_failed_steps(steps)
+        if failed:
+            raise Exception(f"Regional setup failed in {region_name}: {', '.join(failed)}")
+
+        return {"Steps": {name: result.to_dict() for name, result in steps.items()}}
+
+    # Batch mode: one role assumption for every region
+    region_names = event["Regions"]
+    if async_enabled():
+        results = run_async(setup_regions_async(assumed_session, region_names, account_id))
     else:
-        logger.debug(f"No default VPC found in {region_name} in {account_id}")
+        results = setup_regions(assumed_session, region_names, account_id)
 
-    # TODO 11/15: move this into the state machine once the aws-sdk integration has been updated
-    logger.info(f"Enabling snapshot block public access in {region_name} in {account_id}")
-    ec2.enable_snapshot_block_public_access()
+    response = {
+        "Regions": {
+            region_name: {name: result.to_dict() for name, result in steps.items()}
+            for region_name, steps in results.items()
+        }
+    }
+    logger.info("Regional setup complete", results=response)
 
-    logger.info(f"Enabling AMI block public access in {region_name} in {account_id}")
-    ec2.enable_ami_block_public_access()
+    failed_steps = {region_name: get_failed_steps(steps) for region_name, steps in sorted(results.items())}
+    summary = [f"{region_name} ({', '.join(steps)})" for region_name, steps in failed_steps.items() if steps]
+    if summary:
+        raise Exception(f"Regional setup failed in {', '.join(summary)}")
 
-    logger.info(f"Setting default ECS settings in {region_name} in {account_id}")
-    ecs = ECS(assumed_session, region_name)
-    ecs.put_account_setting_default()
+    return response
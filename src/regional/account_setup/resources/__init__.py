@@ -19,8 +19,9 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from .ec2 import EC2
-from .ecs import ECS
+from .ec2 import AsyncEC2, EC2
+from .ecs import AsyncECS, ECS
+from .ssm import AsyncSSM, SSM
 from .sts import STS
 
-__all__ = ["EC2", "ECS", "STS"]
+__all__ = ["AsyncEC2", "AsyncECS", "AsyncSSM", "EC2", "ECS", "SSM", "STS"]
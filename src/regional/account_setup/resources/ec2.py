@@ -19,27 +19,249 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Optional, TYPE_CHECKING
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import partial
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 from aws_lambda_powertools import Logger
-import boto3
 import botocore
 
+from account_setup.aio import get_async_client
+from account_setup.clients import get_client
+from account_setup.concurrency import gather_all, gather_graph, run_all, run_graph
+from account_setup.throttling import remaining_time
+
 if TYPE_CHECKING:
-    from mypy_boto3_ec2 import EC2Client, EC2ServiceResource
+    import boto3
+    from mypy_boto3_ec2 import EC2Client
+    from mypy_boto3_ec2.type_defs import VpcTypeDef, WaiterConfigTypeDef
 
 logger = Logger(child=True)
 
-__all__ = ["EC2"]
+__all__ = ["AsyncEC2", "EC2", "VpcInventory"]
+
+NAT_GATEWAY_POLL_DELAY = 5  # seconds
+NAT_GATEWAY_MAX_ATTEMPTS = 60
+VPC_ENDPOINT_POLL_DELAY = 2  # seconds
+
+
+def _waiter_config(delay: int, max_attempts: int) -> "WaiterConfigTypeDef":
+    """
+    Waiter configuration that gives up before the invocation runs out of time
+    """
+    time_left = remaining_time()
+    if time_left is not None:
+        max_attempts = max(1, min(max_attempts, int(time_left // delay)))
+    return {"Delay": delay, "MaxAttempts": max_attempts}
+
+
+def _check_time(delay: float, waiting_for: str) -> None:
+    """
+    Fail the step when polling again would run past the deadline
+    """
+    time_left = remaining_time()
+    if time_left is not None and time_left < delay:
+        raise TimeoutError(f"Timed out waiting for {waiting_for}")
+
+
+def _waiter_timeout(error: "botocore.exceptions.WaiterError", waiting_for: str) -> Exception:
+    """
+    Report an exhausted waiter as a timeout, other waiter failures unchanged
+    """
+    if "Max attempts exceeded" in str(error.kwargs.get("reason", "")):
+        return TimeoutError(f"Timed out waiting for {waiting_for}")
+    return error
+
+
+@dataclass
+class VpcInventory:
+    """
+    Identifiers of a VPC and everything that has to be removed before the VPC can be deleted
+    """
+
+    vpc_id: str
+    dhcp_options_id: Optional[str] = None
+    internet_gateway_ids: List[str] = field(default_factory=list)
+    egress_only_internet_gateway_ids: List[str] = field(default_factory=list)
+    nat_gateways: Dict[str, str] = field(default_factory=dict)  # NAT gateway ID -> subnet ID
+    vpc_endpoint_ids: List[str] = field(default_factory=list)
+    route_tables: Dict[str, Dict[str, Optional[str]]] = field(default_factory=dict)  # non-main -> associations
+    route_table_associations: Dict[str, Optional[str]] = field(default_factory=dict)  # association ID -> subnet ID
+    security_group_ids: List[str] = field(default_factory=list)
+    subnet_ids: List[str] = field(default_factory=list)
+    network_interfaces: Dict[str, str] = field(default_factory=dict)  # ENI ID -> subnet ID
+    network_acls: Dict[str, List[str]] = field(default_factory=dict)  # non-default NACL ID -> subnet IDs
+
+
+def _inventory_reads(describe: Callable[..., Any], vpc_id: str, dhcp_options_id: Optional[str]) -> Dict[str, Any]:
+    vpc_filter = [{"Name": "vpc-id", "Values": [vpc_id]}]
+    reads: Dict[str, Callable[[], Any]] = {
+        "InternetGateways": partial(
+            describe,
+            "describe_internet_gateways",
+            "InternetGateways",
+            Filters=[{"Name": "attachment.vpc-id", "Values": [vpc_id]}],
+        ),
+        # egress-only internet gateways can only be filtered by tag
+        "EgressOnlyInternetGateways": partial(
+            describe, "describe_egress_only_internet_gateways", "EgressOnlyInternetGateways"
+        ),
+        "NatGateways": partial(describe, "describe_nat_gateways", "NatGateways", Filter=vpc_filter),
+        "VpcEndpoints": partial(describe, "describe_vpc_endpoints", "VpcEndpoints", Filters=vpc_filter),
+        "RouteTables": partial(describe, "describe_route_tables", "RouteTables", Filters=vpc_filter),
+        "SecurityGroups": partial(describe, "describe_security_groups", "SecurityGroups", Filters=vpc_filter),
+        "Subnets": partial(describe, "describe_subnets", "Subnets", Filters=vpc_filter),
+        "NetworkInterfaces": partial(describe, "describe_network_interfaces", "NetworkInterfaces", Filters=vpc_filter),
+        "NetworkAcls": partial(describe, "describe_network_acls", "NetworkAcls", Filters=vpc_filter),
+    }
+    if dhcp_options_id is None:
+        reads["Vpcs"] = partial(describe, "describe_vpcs", "Vpcs", VpcIds=[vpc_id])
+
+    return reads
+
+
+def _vpc_inventory(vpc_id: str, dhcp_options_id: Optional[str], resources: Dict[str, Any]) -> VpcInventory:
+    inventory = VpcInventory(vpc_id=vpc_id, dhcp_options_id=dhcp_options_id)
+    for vpc in resources.get("Vpcs", []):
+        inventory.dhcp_options_id = vpc.get("DhcpOptionsId")
+
+    inventory.internet_gateway_ids = [gw["InternetGatewayId"] for gw in resources["InternetGateways"]]
+    inventory.egress_only_internet_gateway_ids = [
+        gw["EgressOnlyInternetGatewayId"]
+        for gw in resources["EgressOnlyInternetGateways"]
+        if any(attachment.get("VpcId") == vpc_id for attachment in gw.get("Attachments", []))
+    ]
+    inventory.nat_gateways = {
+        gw["NatGatewayId"]: gw["SubnetId"] for gw in resources["NatGateways"] if gw["State"] in ("pending", "available")
+    }
+    inventory.vpc_endpoint_ids = [
+        endpoint["VpcEndpointId"]
+        for endpoint in resources["VpcEndpoints"]
+        if endpoint["State"].lower() not in ("deleting", "deleted")
+    ]
+
+    for rt in resources["RouteTables"]:
+        associations = rt.get("Associations", [])
+        for rta in associations:
+            if not rta.get("Main", False):
+                inventory.route_table_associations[rta["RouteTableAssociationId"]] = rta.get("SubnetId")
+        if not any(rta.get("Main", False) for rta in associations):
+            inventory.route_tables[rt["RouteTableId"]] = {
+                rta["RouteTableAssociationId"]: rta.get("SubnetId") for rta in associations
+            }
+
+    inventory.security_group_ids = [sg["GroupId"] for sg in resources["SecurityGroups"] if sg["GroupName"] != "default"]
+    inventory.subnet_ids = [subnet["SubnetId"] for subnet in resources["Subnets"]]
+
+    # the requester-managed interfaces are removed along with their owner
+    inventory.network_interfaces = {
+        interface["NetworkInterfaceId"]: interface["SubnetId"]
+        for interface in resources["NetworkInterfaces"]
+        if not interface.get("RequesterManaged", False)
+    }
+    inventory.network_acls = {
+        nacl["NetworkAclId"]: [association["SubnetId"] for association in nacl.get("Associations", [])]
+        for nacl in resources["NetworkAcls"]
+        if not nacl.get("IsDefault", False)
+    }
+
+    return inventory
+
+
+def _deletion_graph(
+    ec2: Any, client: Any, inventory: VpcInventory
+) -> Tuple[Dict[str, Callable[[], Any]], Dict[str, Set[str]]]:
+    """
+    Return the deletions of a VPC and its dependents, with the deletions each one has to wait for
+    """
+    vpc_id = inventory.vpc_id
+    tasks: Dict[str, Callable[[], Any]] = {}
+    dependencies: Dict[str, Set[str]] = defaultdict(set)
+
+    # NAT gateways and endpoints own requester-managed network interfaces in the subnets
+    for nat_gateway_id in inventory.nat_gateways:
+        tasks[f"nat:{nat_gateway_id}"] = partial(ec2._delete_nat_gateway, nat_gateway_id)
+
+    if inventory.vpc_endpoint_ids:
+        tasks["endpoints"] = partial(ec2._delete_vpc_endpoints, inventory.vpc_endpoint_ids)
+
+    for eigw_id in inventory.egress_only_internet_gateway_ids:
+        tasks[f"eigw:{eigw_id}"] = partial(ec2._delete_egress_only_internet_gateway, eigw_id)
+
+    # detach and delete all gateways associated with the vpc, public NAT gateways must be gone first
+    for gw_id in inventory.internet_gateway_ids:
+        tasks[f"igw:{gw_id}"] = partial(ec2._delete_internet_gateway, gw_id, vpc_id)
+        dependencies[f"igw:{gw_id}"].update(f"nat:{nat_gateway_id}" for nat_gateway_id in inventory.nat_gateways)
+
+    # Route table associations, then the non-main route tables themselves
+    for association_id in inventory.route_table_associations:
+        tasks[f"rta:{association_id}"] = partial(ec2._disassociate_route_table, association_id)
+
+    for rt_id, associations in inventory.route_tables.items():
+        tasks[f"rt:{rt_id}"] = partial(client.delete_route_table, RouteTableId=rt_id)
+        dependencies[f"rt:{rt_id}"].update(f"rta:{association_id}" for association_id in associations)
+
+    # Network interfaces
+    for interface_id in inventory.network_interfaces:
+        tasks[f"eni:{interface_id}"] = partial(client.delete_network_interface, NetworkInterfaceId=interface_id)
+
+    # Subnets, once nothing is placed in them anymore
+    for subnet_id in inventory.subnet_ids:
+        tasks[f"subnet:{subnet_id}"] = partial(client.delete_subnet, SubnetId=subnet_id)
+        dependencies[f"subnet:{subnet_id}"].add("endpoints")
+        for dependents, prefix in (
+            (inventory.route_table_associations, "rta"),
+            (inventory.nat_gateways, "nat"),
+            (inventory.network_interfaces, "eni"),
+        ):
+            dependencies[f"subnet:{subnet_id}"].update(
+                f"{prefix}:{key}" for key, value in dependents.items() if value == subnet_id
+            )
+
+    # Security Group, once no interface references it anymore
+    for sg_id in inventory.security_group_ids:
+        tasks[f"sg:{sg_id}"] = partial(client.delete_security_group, GroupId=sg_id)
+        dependencies[f"sg:{sg_id}"].update(f"eni:{interface_id}" for interface_id in inventory.network_interfaces)
+        dependencies[f"sg:{sg_id}"].add("endpoints")
+
+    # Network ACLs, once the subnets they are associated with are gone
+    for nacl_id, subnet_ids in inventory.network_acls.items():
+        tasks[f"nacl:{nacl_id}"] = partial(client.delete_network_acl, NetworkAclId=nacl_id)
+        dependencies[f"nacl:{nacl_id}"].update(f"subnet:{subnet_id}" for subnet_id in subnet_ids)
+
+    # DHCP Options
+    if inventory.dhcp_options_id and inventory.dhcp_options_id != "default":
+        tasks["dhcp"] = partial(ec2._delete_dhcp_options, inventory.dhcp_options_id, vpc_id)
+
+    # Delete VPC
+    dependencies["vpc"].update(tasks.keys())
+    tasks["vpc"] = partial(client.delete_vpc, VpcId=vpc_id)
+
+    return tasks, dependencies
 
 
 class EC2:
-    def __init__(self, session: boto3.Session, region: str) -> None:
-        self.client: EC2Client = session.client("ec2", region_name=region)
+    def __init__(self, session: "boto3.Session", region: str) -> None:
+        self.client: EC2Client = get_client(session, "ec2", region)
         self.session = session
         self.region_name = region
 
     def get_default_vpc_id(self) -> Optional[str]:
+        vpc = self._get_default_vpc()
+        return vpc["VpcId"] if vpc else None
+
+    def get_default_vpc(self) -> Optional[VpcInventory]:
+        """
+        Describe the default VPC and every resource in it, None when there is no default VPC
+        """
+        vpc = self._get_default_vpc()
+        if not vpc:
+            return None
+        return self.get_vpc_inventory(vpc["VpcId"], vpc.get("DhcpOptionsId"))
+
+    def _get_default_vpc(self) -> Optional["VpcTypeDef"]:
         params = {
             "Filters": [
                 {
@@ -54,65 +276,245 @@ class EC2:
         response = self.client.describe_vpcs(**params)
         for vpc in response.get("Vpcs", []):
             if vpc.get("IsDefault", False):
-                return vpc["VpcId"]
+                return vpc
 
         logger.debug(f"No default VPC found in {self.region_name}", region=self.region_name)
         return None
 
-    def delete_vpc(self, vpc_id: str) -> None:
-        ec2: EC2ServiceResource = self.session.resource("ec2", region_name=self.region_name)
-        vpc = ec2.Vpc(vpc_id)
+    def get_vpc_inventory(self, vpc_id: str, dhcp_options_id: Optional[str] = None) -> VpcInventory:
+        """
+        Describe every resource in a VPC with one concurrent round of vpc-id filtered calls
+        """
+        resources = run_all(_inventory_reads(self._describe, vpc_id, dhcp_options_id))
+        return _vpc_inventory(vpc_id, dhcp_options_id, resources)
 
-        # detach and delete all gateways associated with the vpc
-        for gw in vpc.internet_gateways.all():
-            vpc.detach_internet_gateway(InternetGatewayId=gw.id)
-            gw.delete()
+    def delete_vpc(self, vpc_id: str, inventory: Optional[VpcInventory] = None) -> None:
+        """
+        Delete a VPC and its dependents, running every independent deletion in parallel
 
-        # Route table associations
-        for rt in vpc.route_tables.all():
-            for rta in rt.associations:
-                if not rta.main:
-                    rta.delete()
+        The resources are described first unless the inventory of the VPC is given.
+        """
+        if not inventory or inventory.vpc_id != vpc_id:
+            inventory = self.get_vpc_inventory(vpc_id)
 
-        # Security Group
-        for sg in vpc.security_groups.all():
-            if sg.group_name != "default":
-                sg.delete()
+        tasks, dependencies = _deletion_graph(self, self.client, inventory)
+        run_graph(tasks, dependencies)
+        logger.info(
+            f"VPC {vpc_id} and associated resources has been deleted in {self.region_name}.", region=self.region_name
+        )
 
-        # Network interfaces
-        for subnet in vpc.subnets.all():
-            for interface in subnet.network_interfaces.all():
-                interface.delete()
-            subnet.delete()
+    def _describe(self, operation: str, key: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        # the operation is only known at runtime
+        get_paginator: Callable[..., Any] = self.client.get_paginator
+        paginator = get_paginator(operation)
+        page_iterator = paginator.paginate(**kwargs)
+        return [item for page in page_iterator for item in page.get(key, [])]
 
-        # Network ACLs
-        for nacl in vpc.network_acls.all():
-            if not nacl.is_default:
-                nacl.delete()
+    def _delete_internet_gateway(self, internet_gateway_id: str, vpc_id: str) -> None:
+        self.client.detach_internet_gateway(InternetGatewayId=internet_gateway_id, VpcId=vpc_id)
+        self.client.delete_internet_gateway(InternetGatewayId=internet_gateway_id)
 
-        # DHCP Options
-        if vpc.dhcp_options and vpc.dhcp_options_id != "default":
-            dhcp_options_id = vpc.dhcp_options_id
+    def _delete_egress_only_internet_gateway(self, egress_only_internet_gateway_id: str) -> None:
+        self.client.delete_egress_only_internet_gateway(EgressOnlyInternetGatewayId=egress_only_internet_gateway_id)
 
-            vpc.associate_dhcp_options(DhcpOptionsId="default")  # associate no DHCP options
+    def _delete_nat_gateway(self, nat_gateway_id: str) -> None:
+        self.client.delete_nat_gateway(NatGatewayId=nat_gateway_id)
 
-            dhcp_options = ec2.DhcpOptions(dhcp_options_id)
-            dhcp_options.delete()
+        # the elastic IP and network interface are only released once the gateway is deleted
+        waiter = self.client.get_waiter("nat_gateway_deleted")
+        try:
+            waiter.wait(
+                NatGatewayIds=[nat_gateway_id],
+                WaiterConfig=_waiter_config(NAT_GATEWAY_POLL_DELAY, NAT_GATEWAY_MAX_ATTEMPTS),
+            )
+        except botocore.exceptions.WaiterError as error:
+            raise _waiter_timeout(error, f"NAT gateway {nat_gateway_id} deletion") from error
 
-        # Delete VPC
-        self.client.delete_vpc(VpcId=vpc_id)
-        logger.info(
-            f"VPC {vpc_id} and associated resources has been deleted in {self.region_name}.", region=self.region_name
-        )
+    def _delete_vpc_endpoints(self, vpc_endpoint_ids: List[str]) -> None:
+        response = self.client.delete_vpc_endpoints(VpcEndpointIds=vpc_endpoint_ids)
+        unsuccessful = {item["ResourceId"] for item in response.get("Unsuccessful", [])}
+        for item in response.get("Unsuccessful", []):
+            logger.warning(f"Unable to delete VPC endpoint {item['ResourceId']}: {item['Error']['Message']}")
+
+        # interface endpoints release their network interfaces asynchronously
+        remaining = [vpc_endpoint_id for vpc_endpoint_id in vpc_endpoint_ids if vpc_endpoint_id not in unsuccessful]
+        while remaining:
+            described = self.client.describe_vpc_endpoints(
+                Filters=[{"Name": "vpc-endpoint-id", "Values": remaining}],
+            )
+            remaining = [
+                endpoint["VpcEndpointId"]
+                for endpoint in described.get("VpcEndpoints", [])
+                if endpoint["State"].lower() != "deleted"
+            ]
+            if remaining:
+                _check_time(VPC_ENDPOINT_POLL_DELAY, f"VPC endpoint deletion of {', '.join(remaining)}")
+                time.sleep(VPC_ENDPOINT_POLL_DELAY)
+
+    def _disassociate_route_table(self, association_id: str) -> None:
+        self.client.disassociate_route_table(AssociationId=association_id)
+
+    def _delete_dhcp_options(self, dhcp_options_id: str, vpc_id: str) -> None:
+        self.client.associate_dhcp_options(DhcpOptionsId="default", VpcId=vpc_id)  # associate no DHCP options
+        self.client.delete_dhcp_options(DhcpOptionsId=dhcp_options_id)
+
+    def get_snapshot_block_public_access_state(self) -> str:
+        response = self.client.get_snapshot_block_public_access_state()
+        return response["State"]
+
+    def get_image_block_public_access_state(self) -> str:
+        response = self.client.get_image_block_public_access_state()
+        return response["ImageBlockPublicAccessState"]
+
+    def get_ebs_encryption_by_default(self) -> bool:
+        response = self.client.get_ebs_encryption_by_default()
+        return response.get("EbsEncryptionByDefault", False)
+
+    def enable_ebs_encryption_by_default(self) -> None:
+        self.client.enable_ebs_encryption_by_default()
 
     def enable_snapshot_block_public_access(self) -> None:
         try:
             self.client.enable_snapshot_block_public_access(State="block-all-sharing")
         except botocore.exceptions.ClientError:
-            logger.exception(f"Unable to enable snapshot block public access in {self.region}")
+            logger.exception(f"Unable to enable snapshot block public access in {self.region_name}")
 
     def enable_ami_block_public_access(self) -> None:
         try:
             self.client.enable_image_block_public_access(ImageBlockPublicAccessState="block-new-sharing")
         except botocore.exceptions.ClientError:
             logger.exception(f"Unable to enable AMI block public access in {self.region_name}")
+
+
+class AsyncEC2:
+    """
+    EC2 on aiobotocore, deleting the default VPC with the same dependency graph as EC2
+    """
+
+    def __init__(self, session: "boto3.Session", region: str) -> None:
+        self.session = session
+        self.region_name = region
+
+    async def _client(self) -> Any:
+        return await get_async_client(self.session, "ec2", self.region_name)
+
+    async def get_default_vpc_id(self) -> Optional[str]:
+        vpc = await self._get_default_vpc()
+        return vpc["VpcId"] if vpc else None
+
+    async def get_default_vpc(self) -> Optional[VpcInventory]:
+        vpc = await self._get_default_vpc()
+        if not vpc:
+            return None
+        return await self.get_vpc_inventory(vpc["VpcId"], vpc.get("DhcpOptionsId"))
+
+    async def _get_default_vpc(self) -> Optional[Dict[str, Any]]:
+        client = await self._client()
+        response = await client.describe_vpcs(Filters=[{"Name": "isDefault", "Values": ["true"]}])
+        for vpc in response.get("Vpcs", []):
+            if vpc.get("IsDefault", False):
+                return vpc
+
+        logger.debug(f"No default VPC found in {self.region_name}", region=self.region_name)
+        return None
+
+    async def get_vpc_inventory(self, vpc_id: str, dhcp_options_id: Optional[str] = None) -> VpcInventory:
+        resources = await gather_all(_inventory_reads(self._describe, vpc_id, dhcp_options_id))
+        return _vpc_inventory(vpc_id, dhcp_options_id, resources)
+
+    async def delete_vpc(self, vpc_id: str, inventory: Optional[VpcInventory] = None) -> None:
+        if not inventory or inventory.vpc_id != vpc_id:
+            inventory = await self.get_vpc_inventory(vpc_id)
+
+        tasks, dependencies = _deletion_graph(self, await self._client(), inventory)
+
+        await gather_graph(tasks, dependencies)
+        logger.info(
+            f"VPC {vpc_id} and associated resources has been deleted in {self.region_name}.", region=self.region_name
+        )
+
+    async def _describe(self, operation: str, key: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        paginator = (await self._client()).get_paginator(operation)
+        return [item async for page in paginator.paginate(**kwargs) for item in page.get(key, [])]
+
+    async def _delete_internet_gateway(self, internet_gateway_id: str, vpc_id: str) -> None:
+        client = await self._client()
+        await client.detach_internet_gateway(InternetGatewayId=internet_gateway_id, VpcId=vpc_id)
+        await client.delete_internet_gateway(InternetGatewayId=internet_gateway_id)
+
+    async def _delete_egress_only_internet_gateway(self, egress_only_internet_gateway_id: str) -> None:
+        client = await self._client()
+        await client.delete_egress_only_internet_gateway(EgressOnlyInternetGatewayId=egress_only_internet_gateway_id)
+
+    async def _delete_nat_gateway(self, nat_gateway_id: str) -> None:
+        client = await self._client()
+        await client.delete_nat_gateway(NatGatewayId=nat_gateway_id)
+
+        waiter = client.get_waiter("nat_gateway_deleted")
+        try:
+            await waiter.wait(
+                NatGatewayIds=[nat_gateway_id],
+                WaiterConfig=_waiter_config(NAT_GATEWAY_POLL_DELAY, NAT_GATEWAY_MAX_ATTEMPTS),
+            )
+        except botocore.exceptions.WaiterError as error:
+            raise _waiter_timeout(error, f"NAT gateway {nat_gateway_id} deletion") from error
+
+    async def _delete_vpc_endpoints(self, vpc_endpoint_ids: List[str]) -> None:
+        import asyncio
+
+        client = await self._client()
+        response = await client.delete_vpc_endpoints(VpcEndpointIds=vpc_endpoint_ids)
+        unsuccessful = {item["ResourceId"] for item in response.get("Unsuccessful", [])}
+        for item in response.get("Unsuccessful", []):
+            logger.warning(f"Unable to delete VPC endpoint {item['ResourceId']}: {item['Error']['Message']}")
+
+        remaining = [vpc_endpoint_id for vpc_endpoint_id in vpc_endpoint_ids if vpc_endpoint_id not in unsuccessful]
+        while remaining:
+            response = await client.describe_vpc_endpoints(
+                Filters=[{"Name": "vpc-endpoint-id", "Values": remaining}],
+            )
+            remaining = [
+                endpoint["VpcEndpointId"]
+                for endpoint in response.get("VpcEndpoints", [])
+                if endpoint["State"].lower() != "deleted"
+            ]
+            if remaining:
+                _check_time(VPC_ENDPOINT_POLL_DELAY, f"VPC endpoint deletion of {', '.join(remaining)}")
+                await asyncio.sleep(VPC_ENDPOINT_POLL_DELAY)
+
+    async def _disassociate_route_table(self, association_id: str) -> None:
+        await (await self._client()).disassociate_route_table(AssociationId=association_id)
+
+    async def _delete_dhcp_options(self, dhcp_options_id: str, vpc_id: str) -> None:
+        client = await self._client()
+        await client.associate_dhcp_options(DhcpOptionsId="default", VpcId=vpc_id)  # associate no DHCP options
+        await client.delete_dhcp_options(DhcpOptionsId=dhcp_options_id)
+
+    async def get_snapshot_block_public_access_state(self) -> str:
+        response = await (await self._client()).get_snapshot_block_public_access_state()
+        return response["State"]
+
+    async def get_image_block_public_access_state(self) -> str:
+        response = await (await self._client()).get_image_block_public_access_state()
+        return response["ImageBlockPublicAccessState"]
+
+    async def get_ebs_encryption_by_default(self) -> bool:
+        response = await (await self._client()).get_ebs_encryption_by_default()
+        return response.get("EbsEncryptionByDefault", False)
+
+    async def enable_ebs_encryption_by_default(self) -> None:
+        await (await self._client()).enable_ebs_encryption_by_default()
+
+    async def enable_snapshot_block_public_access(self) -> None:
+        try:
+            await (await self._client()).enable_snapshot_block_public_access(State="block-all-sharing")
+        except botocore.exceptions.ClientError:
+            logger.exception(f"Unable to enable snapshot block public access in {self.region_name}")
+
+    async def enable_ami_block_public_access(self) -> None:
+        try:
+            await (await self._client()).enable_image_block_public_access(
+                ImageBlockPublicAccessState="block-new-sharing"
+            )
+        except botocore.exceptions.ClientError:
+            logger.exception(f"Unable to enable AMI block public access in {self.region_name}")
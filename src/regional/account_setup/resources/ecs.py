@@ -19,42 +19,137 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 from aws_lambda_powertools import Logger
-import boto3
 import botocore
 
+from account_setup.aio import get_async_client
+from account_setup.clients import get_client
+from account_setup.concurrency import gather_all, run_all
+
 if TYPE_CHECKING:
+    import boto3
     from mypy_boto3_ecs import ECSClient
 
 logger = Logger(child=True)
 
-__all__ = ["ECS"]
+__all__ = ["AsyncECS", "ECS"]
+
+DEFAULT_ACCOUNT_SETTINGS = {
+    "serviceLongArnFormat": "enabled",
+    "taskLongArnFormat": "enabled",
+    "containerInstanceLongArnFormat": "enabled",
+    "awsvpcTrunking": "enabled",
+    "containerInsights": "enabled",
+    "dualStackIPv6": "enabled",
+    # documentation on https://docs.aws.amazon.com/AmazonECS/latest/developerguide/ecs-account-settings.html#tag-resources-setting is incorrect
+    "tagResourceAuthorization": "on",
+}
+
+
+def _settings_report(region: str, current: Dict[str, str], results: Dict[str, bool]) -> Dict[str, List[str]]:
+    """
+    Log the outcome of every setting and raise when any of them could not be updated
+    """
+    report = {
+        "Changed": sorted(name for name, updated in results.items() if updated),
+        "Compliant": sorted(name for name, value in DEFAULT_ACCOUNT_SETTINGS.items() if current.get(name) == value),
+        "Failed": sorted(name for name, updated in results.items() if not updated),
+    }
+    logger.info(f"ECS account settings in {region}", region=region, settings=report)
+    if report["Failed"]:
+        # fail the step so the settings are retried, the other settings have already been applied
+        raise Exception(f"Unable to enable ECS settings in {region}: {', '.join(report['Failed'])}")
+    return report
 
 
 class ECS:
-    def __init__(self, session: boto3.Session, region: str) -> None:
-        self.client: ECSClient = session.client("ecs", region_name=region)
+    def __init__(self, session: "boto3.Session", region: str) -> None:
+        self.client: ECSClient = get_client(session, "ecs", region)
+        self.region = region
+
+    def list_effective_settings(self) -> Dict[str, str]:
+        """
+        Return the effective account settings by name
+        """
+        settings: Dict[str, str] = {}
+
+        paginator = self.client.get_paginator("list_account_settings")
+        page_iterator = paginator.paginate(effectiveSettings=True)
+        for page in page_iterator:
+            for setting in page.get("settings", []):
+                settings[setting["name"]] = setting["value"]
+
+        return settings
+
+    def put_account_setting_default(self, current: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+        """
+        Update the account default settings that differ from the desired value
+        """
+        if current is None:
+            try:
+                current = self.list_effective_settings()
+            except botocore.exceptions.ClientError:
+                logger.exception(f"Unable to list ECS settings in {self.region}, updating every setting")
+                current = {}
+
+        to_update = {name: value for name, value in DEFAULT_ACCOUNT_SETTINGS.items() if current.get(name) != value}
+
+        results = run_all({name: partial(self._put_setting, name, value) for name, value in to_update.items()})
+        return _settings_report(self.region, current, results)
+
+    def _put_setting(self, name: str, value: str) -> bool:
+        try:
+            self.client.put_account_setting_default(name=name, value=value)
+        except botocore.exceptions.ClientError:
+            logger.exception(f"Unable to enable ECS setting {name} in {self.region}")
+            return False
+        return True
+
+
+class AsyncECS:
+    def __init__(self, session: "boto3.Session", region: str) -> None:
+        self.session = session
         self.region = region
 
-    def put_account_setting_default(self) -> None:
-        names = [
-            "serviceLongArnFormat",
-            "taskLongArnFormat",
-            "containerInstanceLongArnFormat",
-            "awsvpcTrunking",
-            "containerInsights",
-            "dualStackIPv6",
-        ]
-        for name in names:
+    async def _client(self) -> Any:
+        return await get_async_client(self.session, "ecs", self.region)
+
+    async def list_effective_settings(self) -> Dict[str, str]:
+        """
+        Return the effective account settings by name
+        """
+        settings: Dict[str, str] = {}
+
+        paginator = (await self._client()).get_paginator("list_account_settings")
+        async for page in paginator.paginate(effectiveSettings=True):
+            for setting in page.get("settings", []):
+                settings[setting["name"]] = setting["value"]
+
+        return settings
+
+    async def put_account_setting_default(self, current: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+        """
+        Update the account default settings that differ from the desired value
+        """
+        if current is None:
             try:
-                self.client.put_account_setting_default(name=name, value="enabled")
+                current = await self.list_effective_settings()
             except botocore.exceptions.ClientError:
-                logger.exception(f"Unable to enable ECS setting {name} in {self.region}")
+                logger.exception(f"Unable to list ECS settings in {self.region}, updating every setting")
+                current = {}
+
+        to_update = {name: value for name, value in DEFAULT_ACCOUNT_SETTINGS.items() if current.get(name) != value}
+
+        results = await gather_all({name: partial(self._put_setting, name, value) for name, value in to_update.items()})
+        return _settings_report(self.region, current, results)
 
-        # documentation on https://docs.aws.amazon.com/AmazonECS/latest/developerguide/ecs-account-settings.html#tag-resources-setting is incorrect
+    async def _put_setting(self, name: str, value: str) -> bool:
         try:
-            self.client.put_account_setting_default(name="tagResourceAuthorization", value="on")
+            await (await self._client()).put_account_setting_default(name=name, value=value)
         except botocore.exceptions.ClientError:
-            logger.exception(f"Unable to enable ECS setting tagResourceAuthorization in {self.region}")
+            logger.exception(f"Unable to enable ECS setting {name} in {self.region}")
+            return False
+        return True
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from typing import Any, TYPE_CHECKING
+
+from aws_lambda_powertools import Logger
+import botocore
+
+from account_setup.aio import get_async_client
+from account_setup.clients import get_client
+
+if TYPE_CHECKING:
+    import boto3
+    from mypy_boto3_ssm import SSMClient
+
+logger = Logger(child=True)
+
+__all__ = ["AsyncSSM", "SSM"]
+
+PUBLIC_SHARING_SETTING = "servicesetting/ssm/documents/console/public-sharing-permission"
+
+
+class SSM:
+    def __init__(self, session: "boto3.Session", region: str) -> None:
+        self.client: SSMClient = get_client(session, "ssm", region)
+        self.region = region
+        self.partition = session.get_partition_for_region(region)
+
+    def _public_sharing_setting_id(self, account_id: str) -> str:
+        return f"arn:{self.partition}:ssm:{self.region}:{account_id}:{PUBLIC_SHARING_SETTING}"
+
+    def get_public_sharing_permission(self, account_id: str) -> str:
+        """
+        Return whether documents can be shared publicly ("Enable" or "Disable")
+        """
+        response = self.client.get_service_setting(SettingId=self._public_sharing_setting_id(account_id))
+        return response["ServiceSetting"]["SettingValue"]
+
+    def disable_public_sharing(self, account_id: str) -> None:
+        try:
+            self.client.update_service_setting(
+                SettingId=self._public_sharing_setting_id(account_id),
+                SettingValue="Disable",
+            )
+        except botocore.exceptions.ClientError:
+            logger.exception(f"Unable to disable SSM public document sharing in {self.region}")
+
+
+class AsyncSSM:
+    def __init__(self, session: "boto3.Session", region: str) -> None:
+        self.session = session
+        self.region = region
+        self.partition = session.get_partition_for_region(region)
+
+    async def _client(self) -> Any:
+        return await get_async_client(self.session, "ssm", self.region)
+
+    def _public_sharing_setting_id(self, account_id: str) -> str:
+        return f"arn:{self.partition}:ssm:{self.region}:{account_id}:{PUBLIC_SHARING_SETTING}"
+
+    async def get_public_sharing_permission(self, account_id: str) -> str:
+        """
+        Return whether documents can be shared publicly ("Enable" or "Disable")
+        """
+        client = await self._client()
+        response = await client.get_service_setting(SettingId=self._public_sharing_setting_id(account_id))
+        return response["ServiceSetting"]["SettingValue"]
+
+    async def disable_public_sharing(self, account_id: str) -> None:
+        try:
+            await (await self._client()).update_service_setting(
+                SettingId=self._public_sharing_setting_id(account_id),
+                SettingValue="Disable",
+            )
+        except botocore.exceptions.ClientError:
+            logger.exception(f"Unable to disable SSM public document sharing in {self.region}")
@@ -19,39 +19,108 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import TYPE_CHECKING
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import threading
+from typing import Optional, Tuple, TYPE_CHECKING
 
 from aws_lambda_powertools import Logger
-import boto3
+
+from account_setup.clients import get_client
 
 if TYPE_CHECKING:
+    import boto3
     from mypy_boto3_sts import STSClient
 
 logger = Logger(child=True)
 
 __all__ = ["STS"]
 
+# longer than the longest function timeout (15 minutes) so credentials never expire during an invocation
+EXPIRY_MARGIN = timedelta(minutes=16)
+
+# role chaining from the function's role allows at most one hour
+SESSION_DURATION = 3600  # seconds
+
+MAX_CACHED_SESSIONS = 32
+
+
+@dataclass
+class CachedSession:
+    session: "boto3.Session"
+    expiration: datetime
+
+
+class SessionCache:
+    """
+    Least recently used cache of assumed role sessions, keyed by role ARN and session name
+    """
+
+    def __init__(self, maxsize: int = MAX_CACHED_SESSIONS) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Tuple[str, str], CachedSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional["boto3.Session"]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            if entry.expiration - EXPIRY_MARGIN <= datetime.now(timezone.utc):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.session
+
+    def put(self, key: Tuple[str, str], session: "boto3.Session", expiration: datetime) -> None:
+        with self._lock:
+            self._entries[key] = CachedSession(session=session, expiration=expiration)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# shared by every invocation in the execution environment
+SESSIONS = SessionCache()
+
 
 class STS:
-    def __init__(self, session: boto3.Session) -> None:
-        self.client: STSClient = session.client("sts")
+    def __init__(self, session: "boto3.Session") -> None:
+        self.client: STSClient = get_client(session, "sts")
 
-    def assume_role(self, role_arn: str, role_session_name: str = "AccountSetup") -> boto3.Session:
+    def assume_role(self, role_arn: str, role_session_name: str = "AccountSetup") -> "boto3.Session":
         """
         Assume the AWSControlTowerExecution role in an account
+
+        Sessions are reused across warm invocations until shortly before their credentials expire
         """
+        key = (role_arn, role_session_name)
+        session = SESSIONS.get(key)
+        if session:
+            logger.debug(f"Reusing cached credentials for {role_arn}")
+            return session
 
         logger.info(f"Assuming role {role_arn}")
         response = self.client.assume_role(
             RoleArn=role_arn,
             RoleSessionName=role_session_name,
-            DurationSeconds=900,  # shortest duration 15 minutes
+            DurationSeconds=SESSION_DURATION,
         )
 
         credentials = response["Credentials"]
 
-        return boto3.Session(
+        import boto3
+
+        session = boto3.Session(
             aws_access_key_id=credentials["AccessKeyId"],
             aws_secret_access_key=credentials["SecretAccessKey"],
             aws_session_token=credentials["SessionToken"],
         )
+        SESSIONS.put(key, session, credentials["Expiration"])
+
+        return session
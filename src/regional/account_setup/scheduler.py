@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import os
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, TYPE_CHECKING
+
+from aws_lambda_powertools import Logger
+
+from account_setup.compliance import plan_region, probe_region
+from account_setup.resources import EC2, ECS, SSM, STS
+from account_setup.throttling import remaining_time
+
+if TYPE_CHECKING:
+    import boto3
+
+logger = Logger(child=True)
+
+__all__ = ["ASSUME_ROLE", "BulkReport", "BulkScheduler", "PROBE", "WorkItem"]
+
+# work items running at the same time across every account
+MAX_BULK_WORKERS = int(os.getenv("MAX_BULK_WORKERS", "16"))
+
+# seconds between progress log entries
+PROGRESS_INTERVAL = 10.0
+
+ASSUME_ROLE = "AssumeRole"
+PROBE = "Probe"
+
+# worst-case seconds of a step, no step is started with less time left and unfinished regions are handed back
+STEP_DURATIONS = {
+    ASSUME_ROLE: 5.0,
+    PROBE: 15.0,
+    "DeleteDefaultVpc": 360.0,  # waits up to 5 minutes for NAT gateways, then for VPC endpoints
+}
+DEFAULT_STEP_DURATION = 10.0  # seconds
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    """
+    A single step of the regional baseline, the role assumption has no region
+    """
+
+    account_id: str
+    region_name: Optional[str]
+    step: str
+
+
+@dataclass
+class AccountState:
+    role_arn: str
+    regions: Set[str]  # not completed yet
+    ready: Deque[WorkItem] = field(default_factory=deque)
+    session: Optional["boto3.Session"] = None
+    outstanding: Dict[str, int] = field(default_factory=dict)  # region -> steps not finished
+    failed: Dict[str, Dict[str, str]] = field(default_factory=dict)  # region -> step -> error
+
+
+@dataclass
+class BulkReport:
+    total: int = 0
+    completed: int = 0
+    failed: Dict[str, Dict[str, Dict[str, str]]] = field(default_factory=dict)  # account -> region -> step -> error
+    pending: Dict[str, List[str]] = field(default_factory=dict)  # account -> regions
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "Regions": self.total,
+            "Completed": self.completed,
+            "Failed": self.failed,
+            "Pending": self.pending,
+        }
+
+
+class BulkScheduler:
+    """
+    Run the regional baseline of many accounts on one bounded pool
+
+    Each account's work is split into items (account x region x step) and the pool takes the next
+    item from each account in turn, so every account makes progress at the same pace. The process-wide
+    rate limiter applies to every item, so the pool runs as fast as the API limits allow.
+    """
+
+    def __init__(self, session: "boto3.Session", accounts: Dict[str, str], max_workers: int = MAX_BULK_WORKERS) -> None:
+        self.session = session
+        self.accounts = accounts  # account ID -> execution role ARN
+        self.max_workers = max_workers
+        self._state: Dict[str, AccountState] = {}
+        self._rotation: Deque[str] = deque()
+        self._steps: Dict[WorkItem, Callable[[], Any]] = {}
+        self._report = BulkReport()
+
+    def run(self, regions: Dict[str, List[str]]) -> BulkReport:
+        """
+        Set up the given regions of each account, until done or until the invocation runs out of time
+        """
+        for account_id, region_names in regions.items():
+            if not region_names:
+                continue
+            self._state[account_id] = AccountState(role_arn=self.accounts[account_id], regions=set(region_names))
+            self._state[account_id].ready.append(WorkItem(account_id, None, ASSUME_ROLE))
+            self._rotation.append(account_id)
+            self._report.total += len(region_names)
+
+        logger.info(f"Setting up {self._report.total} regions in {len(self._state)} accounts")
+
+        running: Dict[Future, WorkItem] = {}
+        logged = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while len(running) < self.max_workers:
+                    item = self._next_item()
+                    if item is None:
+                        break
+                    running[executor.submit(self._execute, item)] = item
+
+                if not running:
+                    break
+
+                done, _ = wait(running, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._complete(running.pop(future), future)
+
+                if time.monotonic() - logged >= PROGRESS_INTERVAL:
+                    self._log_progress(len(running))
+                    logged = time.monotonic()
+
+        for account_id, state in self._state.items():
+            if state.regions:
+                self._report.pending[account_id] = sorted(state.regions)
+
+        self._log_progress(0)
+        return self._report
+
+    def _next_item(self) -> Optional[WorkItem]:
+        """
+        Take the first item of the next account in turn that can finish before the deadline
+        """
+        time_left = remaining_time()
+        for _ in range(len(self._rotation)):
+            account_id = self._rotation[0]
+            self._rotation.rotate(-1)
+            ready = self._state[account_id].ready
+            for item in ready:
+                if time_left is None or time_left > STEP_DURATIONS.get(item.step, DEFAULT_STEP_DURATION):
+                    ready.remove(item)
+                    return item
+        return None
+
+    def _execute(self, item: WorkItem) -> Any:
+        state = self._state[item.account_id]
+        if item.step == ASSUME_ROLE:
+            return STS(self.session).assume_role(state.role_arn)
+
+        if item.step == PROBE:
+            # probes are only queued with a region once the role has been assumed
+            assert state.session is not None and item.region_name is not None
+            ec2 = EC2(state.session, item.region_name)
+            ecs = ECS(state.session, item.region_name)
+            ssm = SSM(state.session, item.region_name)
+            compliance = probe_region(ec2, ecs, ssm, item.account_id)
+            return plan_region(ec2, ecs, ssm, item.account_id, compliance)
+
+        return self._steps.pop(item)()
+
+    def _complete(self, item: WorkItem, future: Future) -> None:
+        state = self._state[item.account_id]
+        error = future.exception()
+        if error:
+            logger.error(f"{item.step} failed in {item.region_name or 'every region'} in {item.account_id}: {error}")
+
+        if item.step == ASSUME_ROLE:
+            if error:
+                for region_name in sorted(state.regions):
+                    self._fail(item.account_id, region_name, item.step, error)
+                    self._finish(item.account_id, region_name)
+                return
+            state.session = future.result()
+            state.ready.extend(WorkItem(item.account_id, region_name, PROBE) for region_name in sorted(state.regions))
+            return
+
+        # every step after the role assumption has a region
+        assert item.region_name is not None
+        region_name = item.region_name
+        if item.step == PROBE:
+            steps = {} if error else future.result()
+            if error:
+                self._fail(item.account_id, region_name, item.step, error)
+            if not steps:
+                self._finish(item.account_id, region_name)
+                return
+            logger.info(f"Applying regional baseline in {region_name} in {item.account_id}", steps=list(steps))
+            state.outstanding[region_name] = len(steps)
+            step_items = []
+            for step, task in steps.items():
+                step_items.append(WorkItem(item.account_id, region_name, step))
+                self._steps[step_items[-1]] = task
+            # finish the regions already started before probing more, fewer are left over at the deadline
+            state.ready.extendleft(reversed(step_items))
+            return
+
+        if error:
+            self._fail(item.account_id, region_name, item.step, error)
+        state.outstanding[region_name] -= 1
+        if not state.outstanding[region_name]:
+            del state.outstanding[region_name]
+            self._finish(item.account_id, region_name)
+
+    def _fail(self, account_id: str, region_name: str, step: str, error: BaseException) -> None:
+        self._state[account_id].failed.setdefault(region_name, {})[step] = f"{type(error).__name__}: {error}"
+        self._report.failed.setdefault(account_id, {})[region_name] = self._state[account_id].failed[region_name]
+
+    def _finish(self, account_id: str, region_name: str) -> None:
+        self._state[account_id].regions.discard(region_name)
+        self._report.completed += 1
+
+    def _log_progress(self, running: int) -> None:
+        accounts_done = sum(1 for state in self._state.values() if not state.regions)
+        logger.info(
+            f"Set up {self._report.completed} of {self._report.total} regions",
+            accounts_complete=accounts_done,
+            accounts=len(self._state),
+            failed_regions=sum(len(regions) for regions in self._report.failed.values()),
+            running=running,
+        )
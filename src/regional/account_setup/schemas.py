@@ -19,6 +19,8 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+import fastjsonschema
+
 INPUT = {
     "$schema": "http://json-schema.org/draft-07/schema",
     "type": "object",
@@ -29,9 +31,52 @@ INPUT = {
         "Region": {
             "type": "string",
         },
+        "Regions": {
+            "type": "array",
+            "items": {
+                "type": "string",
+            },
+            "minItems": 1,
+        },
         "ExecutionRoleArn": {
             "type": "string",
         },
+        # bulk onboarding
+        "Accounts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "AccountId": {
+                        "type": "string",
+                    },
+                    "ExecutionRoleArn": {
+                        "type": "string",
+                    },
+                },
+                "required": ["AccountId", "ExecutionRoleArn"],
+            },
+            "minItems": 1,
+        },
+        "Pending": {
+            "type": ["object", "null"],
+            "additionalProperties": {
+                "type": "array",
+                "items": {
+                    "type": "string",
+                },
+            },
+        },
+        "Failed": {
+            "type": "object",
+        },
     },
-    "required": ["AccountId", "Region", "ExecutionRoleArn"],
+    "oneOf": [
+        {"required": ["AccountId", "ExecutionRoleArn", "Region"]},
+        {"required": ["AccountId", "ExecutionRoleArn", "Regions"]},
+        {"required": ["Accounts", "Regions"]},
+    ],
 }
+
+# compiled once at init instead of on every invocation
+validate_input = fastjsonschema.compile(INPUT)
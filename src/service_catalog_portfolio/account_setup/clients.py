@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from collections import OrderedDict
+import os
+import threading
+from typing import Any, Callable, Hashable, Optional, Tuple, TYPE_CHECKING
+
+from account_setup.instrumentation import API_METRICS
+from account_setup.throttling import RATE_LIMITER
+
+if TYPE_CHECKING:
+    import boto3
+    from botocore.config import Config
+
+__all__ = ["ClientFactory", "get_client", "get_default_session"]
+
+MAX_CACHED_CLIENTS = int(os.getenv("MAX_CACHED_CLIENTS", "32"))
+
+# botocore defaults to 10, raise it when more threads share a client
+MAX_POOL_CONNECTIONS = int(os.getenv("MAX_POOL_CONNECTIONS", "10"))
+
+
+class ClientFactory:
+    """
+    Least recently used cache of boto3 clients, keyed by credentials, service and region
+    """
+
+    def __init__(self, maxsize: int = MAX_CACHED_CLIENTS, max_pool_connections: int = MAX_POOL_CONNECTIONS) -> None:
+        self.maxsize = maxsize
+        self.max_pool_connections = max_pool_connections
+        self._config: Optional[Config] = None
+        self._clients: OrderedDict[Tuple[Hashable, ...], Any] = OrderedDict()
+        # boto3 sessions are not thread-safe, so clients are also created under the lock
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> "Config":
+        if self._config is None:
+            from botocore.config import Config
+
+            # retries are handled by the shared rate limiter
+            self._config = Config(
+                max_pool_connections=self.max_pool_connections,
+                retries={"mode": "standard", "total_max_attempts": 1},
+            )
+        return self._config
+
+    def client(
+        self, session: "boto3.Session", service_name: str, region_name: Optional[str] = None, **kwargs: Any
+    ) -> Any:
+        with self._lock:
+            credentials = session.get_credentials()
+            identity = credentials.access_key if credentials else None
+            key = (identity, service_name, region_name or session.region_name, tuple(sorted(kwargs.items())))
+
+            client = self._clients.get(key)
+            if client is None:
+                # the stubs only type literal service names
+                create_client: Callable[..., Any] = session.client
+                client = create_client(service_name, region_name=region_name, config=self.config, **kwargs)
+                RATE_LIMITER.register(client)
+                API_METRICS.register(client)
+                self._clients[key] = client
+                while len(self._clients) > self.maxsize:
+                    self._clients.popitem(last=False)
+
+            self._clients.move_to_end(key)
+            return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+
+# shared by every invocation in the execution environment
+CLIENTS = ClientFactory()
+
+
+def get_default_session() -> "boto3.Session":
+    """
+    Return the default session, boto3 is only imported once a client is needed
+    """
+    import boto3
+
+    return boto3._get_default_session()
+
+
+def get_client(session: "boto3.Session", service_name: str, region_name: Optional[str] = None, **kwargs: Any) -> Any:
+    """
+    Return a cached client for the session's credentials
+    """
+    return CLIENTS.client(session, service_name, region_name=region_name, **kwargs)
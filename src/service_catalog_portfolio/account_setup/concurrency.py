@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+
+from aws_lambda_powertools import Logger
+
+logger = Logger(child=True)
+
+__all__ = ["TaskResult", "gather_all", "gather_graph", "gather_isolated", "run_all", "run_graph", "run_isolated"]
+
+T = TypeVar("T")
+
+# botocore keeps 10 connections per client by default
+DEFAULT_MAX_WORKERS = 8
+
+
+def _skip_dependents(pending: Dict[str, Set[str]], failed: str) -> None:
+    blocked = [failed]
+    while blocked:
+        name = blocked.pop()
+        for dependent in [key for key, deps in pending.items() if name in deps]:
+            logger.warning(f"Skipping {dependent}, dependency {name} failed")
+            del pending[dependent]
+            blocked.append(dependent)
+
+
+def run_graph(
+    tasks: Dict[str, Callable[[], None]],
+    dependencies: Optional[Dict[str, Set[str]]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> None:
+    """
+    Run each task as soon as all of its dependencies have completed
+
+    Tasks that depend on a failed task are skipped, every other task still runs and the
+    first error is raised once the pool has drained.
+    """
+    dependencies = dependencies or {}
+    pending: Dict[str, Set[str]] = {name: set(dependencies.get(name, ())) & tasks.keys() for name in tasks}
+    running: Dict[Future, str] = {}
+    errors: List[BaseException] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name in [key for key, deps in pending.items() if not deps]:
+                del pending[name]
+                running[executor.submit(tasks[name])] = name
+
+            if not running:
+                raise ValueError(f"Dependency cycle between {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error:
+                    logger.error(f"Task {name} failed: {error}")
+                    errors.append(error)
+                    _skip_dependents(pending, name)
+                    continue
+
+                for deps in pending.values():
+                    deps.discard(name)
+
+    if errors:
+        raise errors[0]
+
+
+def run_all(tasks: Dict[str, Callable[[], T]], max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, T]:
+    """
+    Run independent tasks concurrently and return their results by name
+    """
+    if not tasks:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        futures = {name: executor.submit(task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+@dataclass
+class TaskResult:
+    duration: float
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "Status": "SUCCEEDED" if self.succeeded else "FAILED",
+            "Duration": round(self.duration, 3),
+        }
+        if self.error:
+            result["Error"] = self.error
+        return result
+
+
+def run_isolated(tasks: Dict[str, Callable[[], Any]], max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, TaskResult]:
+    """
+    Run independent tasks concurrently, recording the outcome and duration of each one
+
+    A failing task is logged and reported in its result without affecting the others.
+    """
+
+    def timed(name: str, task: Callable[[], Any]) -> TaskResult:
+        start = time.perf_counter()
+        try:
+            task()
+        except Exception as error:
+            logger.exception(f"Task {name} failed")
+            return TaskResult(duration=time.perf_counter() - start, error=f"{type(error).__name__}: {error}")
+        return TaskResult(duration=time.perf_counter() - start)
+
+    return run_all({name: partial(timed, name, task) for name, task in tasks.items()}, max_workers=max_workers)
+
+
+async def gather_graph(
+    tasks: Dict[str, Callable[[], Awaitable[None]]], dependencies: Optional[Dict[str, Set[str]]] = None
+) -> None:
+    """
+    Same as run_graph for coroutines, each task starts on the running event loop once its dependencies completed
+    """
+    import asyncio
+
+    dependencies = dependencies or {}
+    pending: Dict[str, Set[str]] = {name: set(dependencies.get(name, ())) & tasks.keys() for name in tasks}
+    running: Dict["asyncio.Future[None]", str] = {}
+    errors: List[BaseException] = []
+
+    while pending or running:
+        for name in [key for key, deps in pending.items() if not deps]:
+            del pending[name]
+            running[asyncio.ensure_future(tasks[name]())] = name
+
+        if not running:
+            raise ValueError(f"Dependency cycle between {sorted(pending)}")
+
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            error = future.exception()
+            if error:
+                logger.error(f"Task {name} failed: {error}")
+                errors.append(error)
+                _skip_dependents(pending, name)
+                continue
+
+            for deps in pending.values():
+                deps.discard(name)
+
+    if errors:
+        raise errors[0]
+
+
+async def gather_all(tasks: Dict[str, Callable[[], Awaitable[T]]]) -> Dict[str, T]:
+    """
+    Await independent coroutines concurrently on the running event loop and return their results by name
+    """
+    import asyncio
+
+    results = await asyncio.gather(*(task() for task in tasks.values()))
+    return dict(zip(tasks, results))
+
+
+async def gather_isolated(tasks: Dict[str, Callable[[], Awaitable[Any]]]) -> Dict[str, TaskResult]:
+    """
+    Same as run_isolated for coroutines, every task runs on the running event loop
+    """
+
+    async def timed(name: str, task: Callable[[], Awaitable[Any]]) -> TaskResult:
+        start = time.perf_counter()
+        try:
+            await task()
+        except Exception as error:
+            logger.exception(f"Task {name} failed")
+            return TaskResult(duration=time.perf_counter() - start, error=f"{type(error).__name__}: {error}")
+        return TaskResult(duration=time.perf_counter() - start)
+
+    return await gather_all({name: partial(timed, name, task) for name, task in tasks.items()})
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from dataclasses import dataclass, field
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.middleware_factory import lambda_handler_decorator
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from account_setup.throttling import THROTTLING_ERROR_CODES
+
+logger = Logger(child=True)
+
+__all__ = ["API_METRICS", "ApiMetrics", "OperationStats", "api_metrics"]
+
+# latencies kept per operation and invocation, CloudWatch accepts up to 100 values per metric
+MAX_LATENCY_SAMPLES = int(os.getenv("MAX_LATENCY_SAMPLES", "100"))
+
+_WAIT_START = "api_metrics_wait_start"
+_SEND_START = "api_metrics_send_start"
+_LATENCIES = "api_metrics_latencies"
+_WAIT = "api_metrics_wait"
+_THROTTLES = "api_metrics_throttles"
+
+
+@dataclass
+class OperationStats:
+    """
+    Calls made to a single operation in a single region
+    """
+
+    calls: int = 0
+    errors: int = 0
+    attempts: int = 0
+    retries: int = 0
+    throttles: int = 0
+    rate_limit_wait: float = 0.0  # milliseconds
+    total_latency: float = 0.0  # milliseconds
+    latencies: List[float] = field(default_factory=list)
+
+    def record(self, latencies: List[float], wait: float, throttles: int, error: bool) -> None:
+        self.calls += 1
+        self.errors += int(error)
+        self.retries += max(0, len(latencies) - 1)
+        self.throttles += throttles
+        self.rate_limit_wait += wait
+
+        for latency in latencies:
+            self.attempts += 1
+            self.total_latency += latency
+            # reservoir sample, so the percentiles stay representative of every attempt
+            if len(self.latencies) < MAX_LATENCY_SAMPLES:
+                self.latencies.append(latency)
+            else:
+                index = random.randrange(self.attempts)
+                if index < MAX_LATENCY_SAMPLES:
+                    self.latencies[index] = latency
+
+
+def _stop_wait(context: Dict[str, Any]) -> float:
+    now = time.perf_counter()
+    start = context.pop(_WAIT_START, None)
+    if start is not None:
+        context[_WAIT] = context.get(_WAIT, 0.0) + (now - start) * 1000
+    return now
+
+
+class ApiMetrics:
+    """
+    Process-wide call count, attempt latency, rate limiter wait, retries and throttles per service, operation and region
+    """
+
+    def __init__(self) -> None:
+        self._stats: Dict[Tuple[str, str, Optional[str]], OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def register(self, client: Any) -> None:
+        """
+        Record every call made by a client, including the attempts retried by the rate limiter
+
+        Latency is measured per attempt, from the moment the rate limiter lets the request through until
+        its response is received, so it excludes both the wait for a token and the delay between retries.
+        """
+        service_id = client.meta.service_model.service_id.hyphenize()
+        region_name = client.meta.region_name
+
+        def before_wait(request: Any, **kwargs: Any) -> None:
+            request.context[_WAIT_START] = time.perf_counter()
+
+        def before_send(request: Any, **kwargs: Any) -> None:
+            request.context[_SEND_START] = _stop_wait(request.context)
+
+        def response_received(
+            context: Dict[str, Any], parsed_response: Optional[Dict[str, Any]] = None, **kwargs: Any
+        ) -> None:
+            # still waiting when the rate limiter gave up before the deadline
+            _stop_wait(context)
+            start = context.pop(_SEND_START, None)
+            if start is not None:
+                context.setdefault(_LATENCIES, []).append((time.perf_counter() - start) * 1000)
+            code = (parsed_response or {}).get("Error", {}).get("Code")
+            if code in THROTTLING_ERROR_CODES:
+                context[_THROTTLES] = context.get(_THROTTLES, 0) + 1
+
+        def after_call(model: Any, context: Dict[str, Any], http_response: Any, **kwargs: Any) -> None:
+            self._record(service_id, model.name, region_name, context, error=http_response.status_code >= 300)
+
+        def after_call_error(event_name: str, context: Dict[str, Any], **kwargs: Any) -> None:
+            self._record(service_id, event_name.rsplit(".", 1)[-1], region_name, context, error=True)
+
+        # around the rate limiter's own before-send handler
+        client.meta.events.register_first(f"before-send.{service_id}", before_wait)
+        client.meta.events.register_last(f"before-send.{service_id}", before_send)
+        client.meta.events.register(f"response-received.{service_id}", response_received)
+        client.meta.events.register(f"after-call.{service_id}", after_call)
+        client.meta.events.register(f"after-call-error.{service_id}", after_call_error)
+
+    def _record(
+        self, service_id: str, operation_name: str, region_name: Optional[str], context: Dict[str, Any], error: bool
+    ) -> None:
+        latencies = context.pop(_LATENCIES, [])
+        wait = context.pop(_WAIT, 0.0)
+        throttles = context.pop(_THROTTLES, 0)
+
+        key = (service_id, operation_name, region_name)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = OperationStats()
+            stats.record(latencies, wait, throttles, error)
+
+    def snapshot(self) -> Dict[Tuple[str, str, Optional[str]], OperationStats]:
+        """
+        Return the calls recorded since the last flush and start over
+        """
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return stats
+
+    def flush(self, account_id: Optional[str] = None) -> None:
+        """
+        Publish the recorded calls as CloudWatch embedded metrics, one metric set per operation and region
+        """
+        stats = self.snapshot()
+        if not stats:
+            return
+        if not os.getenv("POWERTOOLS_METRICS_NAMESPACE"):
+            logger.debug("POWERTOOLS_METRICS_NAMESPACE is not set, not publishing API metrics")
+            return
+
+        from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+
+        for (service_id, operation_name, region_name), operation in sorted(stats.items(), key=str):
+            metrics = EphemeralMetrics()
+            metrics.add_dimension(name="AwsService", value=service_id)
+            metrics.add_dimension(name="Operation", value=operation_name)
+            if region_name:
+                metrics.add_dimension(name="Region", value=region_name)
+            if account_id:
+                # kept out of the dimensions so each account does not create its own metrics
+                metrics.add_metadata(key="Account", value=account_id)
+
+            metrics.add_metric(name="Calls", unit=MetricUnit.Count, value=operation.calls)
+            metrics.add_metric(name="Errors", unit=MetricUnit.Count, value=operation.errors)
+            metrics.add_metric(name="Retries", unit=MetricUnit.Count, value=operation.retries)
+            metrics.add_metric(name="Throttles", unit=MetricUnit.Count, value=operation.throttles)
+            metrics.add_metric(name="RateLimitWait", unit=MetricUnit.Milliseconds, value=operation.rate_limit_wait)
+            if operation.latencies:
+                metrics.add_metric(name="TotalLatency", unit=MetricUnit.Milliseconds, value=operation.total_latency)
+                for latency in operation.latencies:
+                    metrics.add_metric(name="Latency", unit=MetricUnit.Milliseconds, value=latency)
+            metrics.flush_metrics()
+
+
+# shared by every client in the execution environment
+API_METRICS = ApiMetrics()
+
+
+@lambda_handler_decorator
+def api_metrics(
+    handler: Callable[[Dict[str, Any], LambdaContext], Any],
+    event: Dict[str, Any],
+    context: LambdaContext,
+) -> Any:
+    """
+    Publish the AWS API calls made by the invocation, tagged with the account being set up
+
+    Events without an account are tagged with the function's own account.
+    """
+    try:
+        return handler(event, context)
+    finally:
+        account_id = event.get("AccountId") if isinstance(event, dict) else None
+        if not account_id:
+            account_id = context.invoked_function_arn.split(":")[4]
+        try:
+            API_METRICS.flush(account_id=account_id)
+        except Exception:
+            # metrics never fail the invocation
+            logger.exception("Unable to publish API metrics")
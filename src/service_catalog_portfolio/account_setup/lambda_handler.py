@@ -19,15 +19,33 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+from dataclasses import dataclass, field
+from functools import partial
 import os
-from typing import Dict, Any, List
+from typing import Awaitable, Callable, Dict, Any, List, Set, TYPE_CHECKING
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from aws_lambda_powertools.utilities.validation import validator
 
-from account_setup.resources import IAM, ServiceCatalog, STS
-from account_setup.schemas import INPUT
+from account_setup.aio import async_enabled, run_async
+from account_setup.concurrency import TaskResult, gather_all, gather_isolated, run_all, run_isolated
+from account_setup.instrumentation import api_metrics
+from account_setup.resources import (
+    AsyncIAM,
+    AsyncServiceCatalog,
+    IAM,
+    PRINCIPAL_TYPE_IAM,
+    PRINCIPAL_TYPE_IAM_PATTERN,
+    ServiceCatalog,
+    STS,
+    sso_role_pattern,
+)
+from account_setup.schemas import validate_input
+from account_setup.throttling import set_deadline
+from account_setup.validation import validator
+
+if TYPE_CHECKING:
+    import boto3
 
 tracer = Tracer()
 logger = Logger()
@@ -44,34 +62,273 @@ def get_env_list(key: str) -> List[str]:
 PORTFOLIO_IDS = get_env_list("PORTFOLIO_IDS")
 PERMISSION_SET_NAMES = get_env_list("PERMISSION_SET_NAMES")
 
+# IAM associates the SSO roles that exist in the account, IAM_PATTERN associates patterns matching them
+PRINCIPAL_TYPE = os.getenv("PRINCIPAL_TYPE", PRINCIPAL_TYPE_IAM)
 
-@validator(inbound_schema=INPUT)
-@tracer.capture_lambda_handler
-@logger.inject_lambda_context(log_event=True)
-def handler(event: Dict[str, Any], context: LambdaContext) -> None:
-    session = STS().assume_role(event["ExecutionRoleArn"], "service_catalog_portfolio")
 
-    iam = IAM(session)
+# portfolios and principal changes share the client's connection pool, 10 connections by default
+MAX_PORTFOLIO_WORKERS = 4
+MAX_PRINCIPAL_WORKERS = 2
+
+
+@dataclass
+class PortfolioState:
+    accepted: bool
+    principals: Dict[str, str] = field(default_factory=dict)
+
+
+def _portfolio_states(
+    portfolio_ids: List[str], accepted: Set[str], principals: Dict[str, Dict[str, str]]
+) -> Dict[str, PortfolioState]:
+    return {
+        portfolio_id: PortfolioState(accepted=portfolio_id in accepted, principals=principals.get(portfolio_id, {}))
+        for portfolio_id in portfolio_ids
+    }
+
+
+def read_portfolios(servicecatalog: ServiceCatalog, portfolio_ids: List[str]) -> Dict[str, PortfolioState]:
+    """
+    Read whether each portfolio share was accepted and its current principals before any change is made
+    """
+    accepted = servicecatalog.list_accepted_portfolio_shares()
+
+    # principals can only be associated once the share has been accepted
+    principals = run_all(
+        {
+            portfolio_id: partial(servicecatalog.list_principals_for_portfolio, portfolio_id)
+            for portfolio_id in portfolio_ids
+            if portfolio_id in accepted
+        },
+        max_workers=MAX_PORTFOLIO_WORKERS,
+    )
+
+    return _portfolio_states(portfolio_ids, accepted, principals)
+
+
+async def read_portfolios_async(
+    servicecatalog: AsyncServiceCatalog, portfolio_ids: List[str]
+) -> Dict[str, PortfolioState]:
+    """
+    Same as read_portfolios, with every call on the running event loop
+    """
+    accepted = await servicecatalog.list_accepted_portfolio_shares()
+
+    principals = await gather_all(
+        {
+            portfolio_id: partial(servicecatalog.list_principals_for_portfolio, portfolio_id)
+            for portfolio_id in portfolio_ids
+            if portfolio_id in accepted
+        }
+    )
+
+    return _portfolio_states(portfolio_ids, accepted, principals)
+
+
+@dataclass
+class PortfolioReport:
+    portfolio_id: str
+    share_accepted: bool = False
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "Status": "SUCCEEDED" if self.succeeded else "FAILED",
+            "ShareAccepted": self.share_accepted,
+            "Added": self.added,
+            "Removed": self.removed,
+        }
+        if self.errors:
+            result["Errors"] = self.errors
+        return result
+
+
+def _principal_changes(
+    servicecatalog: Any,
+    portfolio_id: str,
+    state: PortfolioState,
+    principal_arns: Set[str],
+    principal_type: str,
+) -> Dict[str, Callable[[], Any]]:
+    existing_principals = state.principals
+
+    # principals of the other type are removed too, ex. after switching PRINCIPAL_TYPE
+    to_add = principal_arns - existing_principals.keys()
+    to_remove = existing_principals.keys() - principal_arns
+
+    tasks: Dict[str, Callable[[], Any]] = {}
+    for principal_arn in to_add:
+        tasks[f"add:{principal_arn}"] = partial(
+            servicecatalog.associate_principal_with_portfolio,
+            portfolio_id=portfolio_id,
+            principal_arn=principal_arn,
+            principal_type=principal_type,
+        )
+    for principal_arn in to_remove:
+        tasks[f"remove:{principal_arn}"] = partial(
+            servicecatalog.disassociate_principal_from_portfolio,
+            portfolio_id=portfolio_id,
+            principal_arn=principal_arn,
+            principal_type=existing_principals[principal_arn],
+        )
+    return tasks
+
+
+def _record_changes(report: PortfolioReport, results: Dict[str, TaskResult]) -> PortfolioReport:
+    for name, result in results.items():
+        action, principal_arn = name.split(":", 1)
+        if result.error is not None:
+            report.errors[name] = result.error
+        elif action == "add":
+            report.added.append(principal_arn)
+        else:
+            report.removed.append(principal_arn)
+    return report
+
+
+def reconcile_portfolio(
+    servicecatalog: ServiceCatalog,
+    portfolio_id: str,
+    state: PortfolioState,
+    principal_arns: Set[str],
+    principal_type: str,
+) -> PortfolioReport:
+    """
+    Accept the portfolio share if needed and associate exactly the given principals with the portfolio
+    """
+    report = PortfolioReport(portfolio_id)
+
+    if not state.accepted:
+        try:
+            servicecatalog.accept_portfolio_share(portfolio_id)
+        except Exception as error:
+            report.errors[portfolio_id] = f"{type(error).__name__}: {error}"
+            return report
+        report.share_accepted = True
+
+    tasks = _principal_changes(servicecatalog, portfolio_id, state, principal_arns, principal_type)
+    return _record_changes(report, run_isolated(tasks, max_workers=MAX_PRINCIPAL_WORKERS))
 
-    role_arns = set()
 
-    for permission_set_name in PERMISSION_SET_NAMES:
-        role_arn = iam.get_role_arn(permission_set_name)
-        if role_arn:
-            role_arns.add(role_arn)
+async def reconcile_portfolio_async(
+    servicecatalog: AsyncServiceCatalog,
+    portfolio_id: str,
+    state: PortfolioState,
+    principal_arns: Set[str],
+    principal_type: str,
+) -> PortfolioReport:
+    """
+    Same as reconcile_portfolio, with every call on the running event loop
+    """
+    report = PortfolioReport(portfolio_id)
+
+    if not state.accepted:
+        try:
+            await servicecatalog.accept_portfolio_share(portfolio_id)
+        except Exception as error:
+            report.errors[portfolio_id] = f"{type(error).__name__}: {error}"
+            return report
+        report.share_accepted = True
+
+    tasks = _principal_changes(servicecatalog, portfolio_id, state, principal_arns, principal_type)
+    return _record_changes(report, await gather_isolated(tasks))
+
+
+def get_principal_arns(session: "boto3.Session", account_id: str, partition: str) -> Set[str]:
+    """
+    Return the principals to associate with every portfolio
+    """
+    if PRINCIPAL_TYPE == PRINCIPAL_TYPE_IAM_PATTERN:
+        # patterns also match roles SSO creates later, so the account's roles are never listed
+        return {sso_role_pattern(name, partition) for name in PERMISSION_SET_NAMES}
+
+    # listed again unless every permission set has a cached role, a stale list would disassociate principals
+    roles = IAM(session, account_id=account_id).get_sso_roles(PERMISSION_SET_NAMES)
+    return {roles[name] for name in PERMISSION_SET_NAMES if name in roles}
+
+
+async def get_principal_arns_async(session: "boto3.Session", account_id: str, partition: str) -> Set[str]:
+    if PRINCIPAL_TYPE == PRINCIPAL_TYPE_IAM_PATTERN:
+        return {sso_role_pattern(name, partition) for name in PERMISSION_SET_NAMES}
+
+    roles = await AsyncIAM(session, account_id=account_id).get_sso_roles(PERMISSION_SET_NAMES)
+    return {roles[name] for name in PERMISSION_SET_NAMES if name in roles}
+
+
+def reconcile_portfolios(session: "boto3.Session", account_id: str, partition: str) -> Dict[str, PortfolioReport]:
+    """
+    Reconcile every portfolio, reading the current state before any change is made
+    """
+    principal_arns = get_principal_arns(session, account_id, partition)
 
     servicecatalog = ServiceCatalog(session)
 
-    for portfolio_id in PORTFOLIO_IDS:
-        servicecatalog.accept_portfolio_share(portfolio_id)
+    states = read_portfolios(servicecatalog, PORTFOLIO_IDS)
+
+    return run_all(
+        {
+            portfolio_id: partial(
+                reconcile_portfolio, servicecatalog, portfolio_id, state, principal_arns, PRINCIPAL_TYPE
+            )
+            for portfolio_id, state in states.items()
+        },
+        max_workers=MAX_PORTFOLIO_WORKERS,
+    )
+
+
+async def reconcile_portfolios_async(
+    session: "boto3.Session", account_id: str, partition: str
+) -> Dict[str, PortfolioReport]:
+    """
+    Same as reconcile_portfolios, the roles and the portfolios are read at the same time
+    """
+    servicecatalog = AsyncServiceCatalog(session)
+
+    reads: Dict[str, Callable[[], Awaitable[Any]]] = {
+        "principals": partial(get_principal_arns_async, session, account_id, partition),
+        "states": partial(read_portfolios_async, servicecatalog, PORTFOLIO_IDS),
+    }
+    results = await gather_all(reads)
+    principal_arns: Set[str] = results["principals"]
+    states: Dict[str, PortfolioState] = results["states"]
+
+    return await gather_all(
+        {
+            portfolio_id: partial(
+                reconcile_portfolio_async, servicecatalog, portfolio_id, state, principal_arns, PRINCIPAL_TYPE
+            )
+            for portfolio_id, state in states.items()
+        }
+    )
+
+
+@validator(inbound_validator=validate_input)
+@tracer.capture_lambda_handler
+@logger.inject_lambda_context(log_event=True)
+@api_metrics
+def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    set_deadline(context)
+
+    session = STS().assume_role(event["ExecutionRoleArn"], "service_catalog_portfolio")
+
+    account_id = event["AccountId"]
+    partition = event["ExecutionRoleArn"].split(":")[1]
 
-        existing_principals = servicecatalog.list_principals_for_portfolio(portfolio_id)
+    if async_enabled():
+        reports = run_async(reconcile_portfolios_async(session, account_id, partition))
+    else:
+        reports = reconcile_portfolios(session, account_id, partition)
 
-        to_add = role_arns - existing_principals
-        to_remove = existing_principals - role_arns
+    response = {"Portfolios": {portfolio_id: report.to_dict() for portfolio_id, report in reports.items()}}
+    logger.info("Reconciled portfolios", extra={"portfolios": response["Portfolios"]})
 
-        for role_arn in to_add:
-            servicecatalog.associate_principal_with_portfolio(portfolio_id=portfolio_id, principal_arn=role_arn)
+    failed = [portfolio_id for portfolio_id, report in reports.items() if not report.succeeded]
+    if failed:
+        raise Exception(f"Failed to reconcile portfolios: {', '.join(failed)}")
 
-        for role_arn in to_remove:
-            servicecatalog.disassociate_principal_from_portfolio(portfolio_id=portfolio_id, principal_arn=role_arn)
+    return response
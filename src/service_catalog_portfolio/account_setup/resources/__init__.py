@@ -19,8 +19,23 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from .iam import IAM
-from .servicecatalog import ServiceCatalog
+from .iam import AsyncIAM, IAM
+from .servicecatalog import (
+    AsyncServiceCatalog,
+    PRINCIPAL_TYPE_IAM,
+    PRINCIPAL_TYPE_IAM_PATTERN,
+    ServiceCatalog,
+    sso_role_pattern,
+)
 from .sts import STS
 
-__all__ = ["IAM", "ServiceCatalog", "STS"]
+__all__ = [
+    "AsyncIAM",
+    "AsyncServiceCatalog",
+    "IAM",
+    "PRINCIPAL_TYPE_IAM",
+    "PRINCIPAL_TYPE_IAM_PATTERN",
+    "ServiceCatalog",
+    "STS",
+    "sso_role_pattern",
+]
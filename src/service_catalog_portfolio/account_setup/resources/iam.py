@@ -19,48 +19,170 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from functools import lru_cache
-from typing import Optional, Dict, TYPE_CHECKING
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Optional, Dict, Iterable, Mapping, Tuple, TYPE_CHECKING
 
-import boto3
+from aws_lambda_powertools import Logger
+
+from account_setup.aio import get_async_client
+from account_setup.clients import get_client, get_default_session
 
 if TYPE_CHECKING:
+    import boto3
     from mypy_boto3_iam import IAMClient
 
-__all__ = ["IAM"]
+__all__ = ["AsyncIAM", "IAM"]
+
+logger = Logger(child=True)
 
 AWS_SSO_ROLE_PREFIX = "AWSReservedSSO_"
 
+# IAM Identity Center creates its roles under this path, optionally followed by a region
+AWS_SSO_ROLE_PATH = "/aws-reserved/sso.amazonaws.com/"
+
+# seconds an account's role index is reused before the roles are listed again
+SSO_ROLE_INDEX_TTL = 900
+
+MAX_CACHED_ROLE_INDEXES = 64
+
+
+class RoleIndexCache:
+    """
+    Least recently used cache of SSO role ARNs by permission set name, keyed by account ID
+    """
+
+    def __init__(self, maxsize: int = MAX_CACHED_ROLE_INDEXES, ttl: float = SSO_ROLE_INDEX_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, Dict[str, str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, account_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if not entry:
+                return None
+            expires, roles = entry
+            if expires <= time.monotonic():
+                del self._entries[account_id]
+                return None
+            self._entries.move_to_end(account_id)
+            return roles
+
+    def put(self, account_id: str, roles: Dict[str, str]) -> None:
+        with self._lock:
+            self._entries[account_id] = (time.monotonic() + self.ttl, roles)
+            self._entries.move_to_end(account_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# shared by every invocation in the execution environment
+ROLE_INDEXES = RoleIndexCache()
+
+
+def _add_sso_role(roles: Dict[str, str], role: Mapping[str, Any]) -> None:
+    if role.get("RoleName", "").startswith(AWS_SSO_ROLE_PREFIX):
+        # AWSReservedSSO_AWSAdministratorAccess_a1ff75f56dfb0e2f -> AWSAdministratorAccess
+        permission_set_name = role["RoleName"].rsplit("_", 1)[0].replace(AWS_SSO_ROLE_PREFIX, "", 1)
+        roles[permission_set_name] = role["Arn"]
+
+
+def _has_roles(roles: Dict[str, str], names: Iterable[str]) -> bool:
+    return bool(roles) and all(name in roles for name in names)
+
 
 class IAM:
-    def __init__(self, session: Optional[boto3.Session] = None) -> None:
+    def __init__(self, session: Optional["boto3.Session"] = None, account_id: Optional[str] = None) -> None:
         if not session:
-            session = boto3._get_default_session()
-        self.client: IAMClient = session.client("iam")
+            session = get_default_session()
+        self.client: IAMClient = get_client(session, "iam")
+        # without an account ID the roles are only cached by this instance
+        self._account_id = account_id
         self._roles: Dict[str, str] = {}
 
-    def get_sso_roles(self) -> Dict[str, str]:
+    def get_sso_roles(self, names: Iterable[str] = ()) -> Dict[str, str]:
         """
         Get the list of AWS SSO permission set role ARNs organized by the permission set name
+
+        The roles are listed again when any of the permission sets in `names` is missing from the cached roles.
         """
-        if self._roles:
+        names = list(names)
+        if _has_roles(self._roles, names):
             return self._roles
 
-        roles = {}
+        roles = ROLE_INDEXES.get(self._account_id) if self._account_id else None
+        if roles is None or not _has_roles(roles, names):
+            roles = self.list_sso_roles()
+            # an empty or partial list is not reused, the missing roles may still be provisioning
+            if self._account_id and _has_roles(roles, names):
+                ROLE_INDEXES.put(self._account_id, roles)
+
+        self._roles = roles
+
+        return roles
+
+    def list_sso_roles(self) -> Dict[str, str]:
+        """
+        List only the roles on the AWS SSO reserved path
+        """
+        roles: Dict[str, str] = {}
         paginator = self.client.get_paginator("list_roles")
-        page_iterator = paginator.paginate(PaginationConfig={"PageSize": 1000})
+        page_iterator = paginator.paginate(PathPrefix=AWS_SSO_ROLE_PATH, PaginationConfig={"PageSize": 1000})
         for page in page_iterator:
             for role in page.get("Roles", []):
-                if role.get("RoleName", "").startswith(AWS_SSO_ROLE_PREFIX):
-                    # AWSReservedSSO_AWSAdministratorAccess_a1ff75f56dfb0e2f -> AWSAdministratorAccess
-                    permission_set_name = role["RoleName"].rsplit("_", 1)[0].replace(AWS_SSO_ROLE_PREFIX, "")
-                    roles[permission_set_name] = role["Arn"]
+                _add_sso_role(roles, role)
+
+        logger.debug(f"Found {len(roles)} AWS SSO roles")
+        return roles
+
+    def get_role_arn(self, permission_set_name: str) -> Optional[str]:
+        roles = self.get_sso_roles([permission_set_name])
+        return roles.get(permission_set_name)
+
+
+class AsyncIAM:
+    """
+    IAM on aiobotocore, sharing the role indexes with IAM
+    """
+
+    def __init__(self, session: "boto3.Session", account_id: Optional[str] = None) -> None:
+        self.session = session
+        self._account_id = account_id
+        self._roles: Dict[str, str] = {}
+
+    async def get_sso_roles(self, names: Iterable[str] = ()) -> Dict[str, str]:
+        names = list(names)
+        if _has_roles(self._roles, names):
+            return self._roles
+
+        roles = ROLE_INDEXES.get(self._account_id) if self._account_id else None
+        if roles is None or not _has_roles(roles, names):
+            roles = await self.list_sso_roles()
+            if self._account_id and _has_roles(roles, names):
+                ROLE_INDEXES.put(self._account_id, roles)
 
         self._roles = roles
 
         return roles
 
-    @lru_cache
-    def get_role_arn(self, permission_set_name: str) -> Optional[str]:
-        roles = self.get_sso_roles()
+    async def list_sso_roles(self) -> Dict[str, str]:
+        roles: Dict[str, str] = {}
+        client = await get_async_client(self.session, "iam")
+        paginator = client.get_paginator("list_roles")
+        async for page in paginator.paginate(PathPrefix=AWS_SSO_ROLE_PATH, PaginationConfig={"PageSize": 1000}):
+            for role in page.get("Roles", []):
+                _add_sso_role(roles, role)
+
+        logger.debug(f"Found {len(roles)} AWS SSO roles")
+        return roles
+
+    async def get_role_arn(self, permission_set_name: str) -> Optional[str]:
+        roles = await self.get_sso_roles([permission_set_name])
         return roles.get(permission_set_name)
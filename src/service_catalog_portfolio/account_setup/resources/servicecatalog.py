@@ -19,25 +19,50 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Set, TYPE_CHECKING, Optional
+from typing import Any, Dict, Set, TYPE_CHECKING, Optional
 
 from aws_lambda_powertools import Logger
-import boto3
 import botocore
 
+from account_setup.aio import get_async_client
+from account_setup.clients import get_client, get_default_session
+
 if TYPE_CHECKING:
-    from mypy_boto3_servicecatalog import ServiceCatalogClient, ListPrincipalsForPortfolioPaginator
+    import boto3
+    from mypy_boto3_servicecatalog import (
+        ServiceCatalogClient,
+        ListAcceptedPortfolioSharesPaginator,
+        ListPrincipalsForPortfolioPaginator,
+    )
+    from mypy_boto3_servicecatalog.literals import PortfolioShareTypeType, PrincipalTypeType
 
 logger = Logger(child=True)
 
-__all__ = ["ServiceCatalog"]
+__all__ = [
+    "AsyncServiceCatalog",
+    "PRINCIPAL_TYPE_IAM",
+    "PRINCIPAL_TYPE_IAM_PATTERN",
+    "ServiceCatalog",
+    "sso_role_pattern",
+]
+
+PRINCIPAL_TYPE_IAM: "PrincipalTypeType" = "IAM"
+PRINCIPAL_TYPE_IAM_PATTERN: "PrincipalTypeType" = "IAM_PATTERN"
+
+
+def sso_role_pattern(permission_set_name: str, partition: str = "aws") -> str:
+    """
+    Return the IAM_PATTERN principal matching the roles AWS SSO creates for a permission set
+    """
+    # the roles are created under /aws-reserved/sso.amazonaws.com/, optionally followed by a region
+    return f"arn:{partition}:iam:::role/aws-reserved/sso.amazonaws.com/*AWSReservedSSO_{permission_set_name}_*"
 
 
 class ServiceCatalog:
-    def __init__(self, session: Optional[boto3.Session] = None) -> None:
+    def __init__(self, session: Optional["boto3.Session"] = None) -> None:
         if not session:
-            session = boto3._get_default_session()
-        self.client: ServiceCatalogClient = session.client("servicecatalog")
+            session = get_default_session()
+        self.client: ServiceCatalogClient = get_client(session, "servicecatalog")
 
     def accept_portfolio_share(self, portfolio_id: str) -> None:
         try:
@@ -46,32 +71,123 @@ class ServiceCatalog:
             logger.exception("Unable to accept portfolio share")
             raise
 
-    def associate_principal_with_portfolio(self, portfolio_id: str, principal_arn: str) -> None:
+    def list_accepted_portfolio_shares(self, share_type: "PortfolioShareTypeType" = "AWS_ORGANIZATIONS") -> Set[str]:
+        """
+        Return the IDs of the portfolios whose share has already been accepted
+        """
+        portfolio_ids: Set[str] = set()
+
+        paginator: ListAcceptedPortfolioSharesPaginator = self.client.get_paginator("list_accepted_portfolio_shares")
+        page_iterator = paginator.paginate(PortfolioShareType=share_type)
+        for page in page_iterator:
+            for portfolio in page.get("PortfolioDetails", []):
+                portfolio_ids.add(portfolio["Id"])
+
+        return portfolio_ids
+
+    def associate_principal_with_portfolio(
+        self, portfolio_id: str, principal_arn: str, principal_type: "PrincipalTypeType" = PRINCIPAL_TYPE_IAM
+    ) -> None:
         try:
             self.client.associate_principal_with_portfolio(
                 PortfolioId=portfolio_id,
                 PrincipalARN=principal_arn,
-                PrincipalType="IAM",
+                PrincipalType=principal_type,
             )
         except botocore.exceptions.ClientError:
             logger.exception("Unable to associate princpal with portfolio")
             raise
 
-    def disassociate_principal_from_portfolio(self, portfolio_id: str, principal_arn: str) -> None:
+    def disassociate_principal_from_portfolio(
+        self, portfolio_id: str, principal_arn: str, principal_type: "PrincipalTypeType" = PRINCIPAL_TYPE_IAM
+    ) -> None:
         try:
-            self.client.disassociate_principal_from_portfolio(PortfolioId=portfolio_id, PrincipalARN=principal_arn)
+            self.client.disassociate_principal_from_portfolio(
+                PortfolioId=portfolio_id, PrincipalARN=principal_arn, PrincipalType=principal_type
+            )
         except botocore.exceptions.ClientError as error:
             if error.response["Error"]["Code"] != "ResourceNotFoundException":
                 logger.exception("Unable to disassociate princpal from portfolio")
                 raise
 
-    def list_principals_for_portfolio(self, portfolio_id: str) -> Set[str]:
-        principals = set()
+    def list_principals_for_portfolio(self, portfolio_id: str) -> Dict[str, str]:
+        """
+        Return the principal types of the portfolio's principals, keyed by principal ARN
+        """
+        principals: Dict[str, str] = {}
 
         paginator: ListPrincipalsForPortfolioPaginator = self.client.get_paginator("list_principals_for_portfolio")
         page_iterator = paginator.paginate(PortfolioId=portfolio_id)
         for page in page_iterator:
             for principal in page.get("Principals", []):
-                principals.add(principal["PrincipalARN"])
+                principals[principal["PrincipalARN"]] = principal["PrincipalType"]
+
+        return principals
+
+
+class AsyncServiceCatalog:
+    """
+    ServiceCatalog on aiobotocore
+    """
+
+    def __init__(self, session: "boto3.Session") -> None:
+        self.session = session
+
+    async def _client(self) -> Any:
+        return await get_async_client(self.session, "servicecatalog")
+
+    async def accept_portfolio_share(self, portfolio_id: str) -> None:
+        try:
+            await (await self._client()).accept_portfolio_share(
+                PortfolioId=portfolio_id, PortfolioShareType="AWS_ORGANIZATIONS"
+            )
+        except botocore.exceptions.ClientError:
+            logger.exception("Unable to accept portfolio share")
+            raise
+
+    async def list_accepted_portfolio_shares(
+        self, share_type: "PortfolioShareTypeType" = "AWS_ORGANIZATIONS"
+    ) -> Set[str]:
+        portfolio_ids: Set[str] = set()
+
+        paginator = (await self._client()).get_paginator("list_accepted_portfolio_shares")
+        async for page in paginator.paginate(PortfolioShareType=share_type):
+            for portfolio in page.get("PortfolioDetails", []):
+                portfolio_ids.add(portfolio["Id"])
+
+        return portfolio_ids
+
+    async def associate_principal_with_portfolio(
+        self, portfolio_id: str, principal_arn: str, principal_type: "PrincipalTypeType" = PRINCIPAL_TYPE_IAM
+    ) -> None:
+        try:
+            await (await self._client()).associate_principal_with_portfolio(
+                PortfolioId=portfolio_id,
+                PrincipalARN=principal_arn,
+                PrincipalType=principal_type,
+            )
+        except botocore.exceptions.ClientError:
+            logger.exception("Unable to associate princpal with portfolio")
+            raise
+
+    async def disassociate_principal_from_portfolio(
+        self, portfolio_id: str, principal_arn: str, principal_type: "PrincipalTypeType" = PRINCIPAL_TYPE_IAM
+    ) -> None:
+        try:
+            await (await self._client()).disassociate_principal_from_portfolio(
+                PortfolioId=portfolio_id, PrincipalARN=principal_arn, PrincipalType=principal_type
+            )
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] != "ResourceNotFoundException":
+                logger.exception("Unable to disassociate princpal from portfolio")
+                raise
+
+    async def list_principals_for_portfolio(self, portfolio_id: str) -> Dict[str, str]:
+        principals: Dict[str, str] = {}
+
+        paginator = (await self._client()).get_paginator("list_principals_for_portfolio")
+        async for page in paginator.paginate(PortfolioId=portfolio_id):
+            for principal in page.get("Principals", []):
+                principals[principal["PrincipalARN"]] = principal["PrincipalType"]
 
         return principals
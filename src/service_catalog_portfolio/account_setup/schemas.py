@@ -19,13 +19,21 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+import fastjsonschema
+
 INPUT = {
     "$schema": "http://json-schema.org/draft-07/schema",
     "type": "object",
     "properties": {
+        "AccountId": {
+            "type": "string",
+        },
         "ExecutionRoleArn": {
             "type": "string",
         },
     },
-    "required": ["ExecutionRoleArn"],
+    "required": ["AccountId", "ExecutionRoleArn"],
 }
+
+# compiled once at init instead of on every invocation
+validate_input = fastjsonschema.compile(INPUT)
@@ -19,19 +19,139 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Dict, Any, Optional
+import json
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
-import boto3
 
-from .resources import Organizations, IdentityStore, SSO
+from . import resources
+from .aio import async_enabled, run_async
+from .clients import get_default_session
+from .instrumentation import api_metrics
 from .utils import parse_group
 from .constants import GROUP_ORG_PREFIX
+from .reconcile import reconcile
+from .throttling import set_deadline
+
+if TYPE_CHECKING:
+    import boto3
 
 tracer = Tracer()
 logger = Logger()
 
+ACCOUNT_REMOVAL_EVENTS = {"CloseAccount", "RemoveAccountFromOrganization"}
+
+
+def assign_account_groups(groups: Dict[str, Tuple[str, str]]) -> List[str]:
+    """
+    Assign new account groups, keyed by an arbitrary ID, to their account and permission set.
+    Returns the keys of the groups whose assignment failed and may be retried.
+    """
+    pending: Dict[str, Tuple[str, str, str, str]] = {}
+    unresolved: List[str] = []
+
+    # reuse the default session and its resolved credentials across warm invocations
+    session = get_default_session()
+    organizations = resources.Organizations(session)
+
+    for key, (group_id, group_name) in groups.items():
+        try:
+            account_name, permission_set_name = parse_group(group_name)
+        except Exception as error:
+            logger.warn(error)
+            continue
+
+        if not account_name:
+            logger.warn(f"Unrecognized account group name: {group_name}")
+            continue
+
+        account_id = organizations.get_account_id(account_name)
+        if not account_id:
+            # retried, the account may not have joined the organization yet
+            logger.warn(f"No account named '{account_name}'")
+            unresolved.append(key)
+            continue
+
+        pending[key] = (group_id, group_name, account_id, permission_set_name)
+
+    if not pending:
+        return unresolved
+
+    if async_enabled():
+        return unresolved + run_async(assign_pending_groups_async(session, pending))
+    return unresolved + assign_pending_groups(session, pending)
+
+
+def assign_pending_groups(session: "boto3.Session", pending: Dict[str, Tuple[str, str, str, str]]) -> List[str]:
+    """
+    Assign the groups resolved to an account in the SSO instance that has their permission set.
+    Returns the keys of the groups whose assignment failed and may be retried.
+    """
+    sso = resources.SSO(session)
+    failed_keys: List[str] = []
+
+    for instance in sso.list_instances():
+        instance_arn = instance["InstanceArn"]
+
+        assignments: Dict[str, resources.AccountAssignment] = {}
+        for key, (group_id, group_name, account_id, permission_set_name) in list(pending.items()):
+            permission_set_arn = sso.get_permission_set_arn(instance_arn=instance_arn, name=permission_set_name)
+            if permission_set_arn:
+                logger.info(f"Assigning {group_name} permission set {permission_set_name} in {account_id}")
+                assignments[key] = resources.AccountAssignment(
+                    account_id=account_id, permission_set_arn=permission_set_arn, principal_id=group_id
+                )
+                del pending[key]
+
+        if not assignments:
+            continue
+
+        report = sso.create_account_assignments(instance_arn, assignments.values())
+        unfinished = {result.assignment for result in report.failed + report.in_progress}
+        failed_keys.extend(key for key, assignment in assignments.items() if assignment in unfinished)
+
+    for _, _, _, permission_set_name in pending.values():
+        logger.warn(f"Permission Set '{permission_set_name}' not found")
+
+    return failed_keys
+
+
+async def assign_pending_groups_async(
+    session: "boto3.Session", pending: Dict[str, Tuple[str, str, str, str]]
+) -> List[str]:
+    """
+    Same as assign_pending_groups, with every call on the running event loop
+    """
+    sso = resources.AsyncSSO(session)
+    failed_keys: List[str] = []
+
+    for instance in await sso.list_instances():
+        instance_arn = instance["InstanceArn"]
+
+        assignments: Dict[str, resources.AccountAssignment] = {}
+        for key, (group_id, group_name, account_id, permission_set_name) in list(pending.items()):
+            # looked up one at a time, the first lookup describes the permission sets for the others
+            permission_set_arn = await sso.get_permission_set_arn(instance_arn=instance_arn, name=permission_set_name)
+            if permission_set_arn:
+                logger.info(f"Assigning {group_name} permission set {permission_set_name} in {account_id}")
+                assignments[key] = resources.AccountAssignment(
+                    account_id=account_id, permission_set_arn=permission_set_arn, principal_id=group_id
+                )
+                del pending[key]
+
+        if not assignments:
+            continue
+
+        report = await sso.create_account_assignments(instance_arn, assignments.values())
+        unfinished = {result.assignment for result in report.failed + report.in_progress}
+        failed_keys.extend(key for key, assignment in assignments.items() if assignment in unfinished)
+
+    for _, _, _, permission_set_name in pending.values():
+        logger.warn(f"Permission Set '{permission_set_name}' not found")
+
+    return failed_keys
+
 
 @tracer.capture_method(capture_response=False)
 def create_group_event(event: Dict[str, Any]) -> None:
@@ -46,52 +166,266 @@ def create_group_event(event: Dict[str, Any]) -> None:
     group_id = group["groupId"]
     group_name = group["groupName"]
 
-    try:
-        account_name, permission_set_name = parse_group(group_name)
-    except Exception as error:
-        logger.warn(error)
-        return
+    identity_store_id = event.get("requestParameters", {}).get("identityStoreId")
+    resources.GROUP_INDEXES.put(group_id, group_name, identity_store_id=identity_store_id)
 
-    if not account_name:
-        logger.warn(f"Unrecognized account group name: {group_name}")
+    if assign_account_groups({group_id: (group_id, group_name)}):
+        raise Exception(f"Failed to assign {group_name}")
+
+
+@tracer.capture_method(capture_response=False)
+def delete_group_event(event: Dict[str, Any]) -> None:
+    """
+    Drop the deleted group from the group indexes and delete its account assignments
+    """
+    group_id = event.get("requestParameters", {}).get("groupId")
+    if not group_id:
+        logger.warn("No group found in event")
         return
 
-    session = boto3.Session()
-    organizations = Organizations(session)
-    account_id = organizations.get_account_id(account_name)
+    resources.GROUP_INDEXES.remove(group_id)
+
+    sso = resources.SSO(get_default_session())
+    for instance in sso.list_instances():
+        report = sso.delete_group_assignments(instance["InstanceArn"], group_id)
+        if report.failed or report.in_progress:
+            raise Exception(f"Failed to delete {len(report.failed + report.in_progress)} assignments of {group_id}")
+
+
+@tracer.capture_method(capture_response=False)
+def remove_account_event(event: Dict[str, Any]) -> None:
+    """
+    Delete the account assignments of an account that was closed or removed from the organization
+    """
+    account_id = event.get("requestParameters", {}).get("accountId")
     if not account_id:
-        logger.warn(f"No account named '{account_name}'")
+        logger.warn("No account found in event")
         return
 
-    sso = SSO(session)
+    session = get_default_session()
+    resources.Organizations(session).refresh_account(account_id)
 
-    permission_set_arn = None
-    instances = sso.list_instances()
+    sso = resources.SSO(session)
+    for instance in sso.list_instances():
+        report = sso.delete_assignments_in_account(instance["InstanceArn"], account_id)
+        if report.failed or report.in_progress:
+            raise Exception(f"Failed to delete {len(report.failed + report.in_progress)} assignments in {account_id}")
+
+
+@tracer.capture_method(capture_response=False)
+def update_group_event(event: Dict[str, Any]) -> None:
+    """
+    Re-read the display name of the updated group into the group indexes
+    """
+    request_parameters: Dict[str, Any] = event.get("requestParameters", {})
+    group_id = request_parameters.get("groupId")
+    if not group_id:
+        logger.warn("No group found in event")
+        return
+
+    session = get_default_session()
+
+    identity_store_ids = [request_parameters["identityStoreId"]] if "identityStoreId" in request_parameters else []
+    if not identity_store_ids:
+        identity_store_ids = [instance["IdentityStoreId"] for instance in resources.SSO(session).list_instances()]
+
+    for identity_store_id in identity_store_ids:
+        display_name = resources.IdentityStore(session, identity_store_id).refresh_group(group_id)
+        if display_name:
+            logger.info(f"Group {group_id} is now named {display_name}")
+            return
 
+    # no longer readable, treat it like a deleted group
+    resources.GROUP_INDEXES.remove(group_id)
+
+
+@tracer.capture_method(capture_response=False)
+def group_batch_event(event: Dict[str, Any]) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Process a batch of group events from the queue in the order of the batch, reporting the messages to redeliver
+    """
+    failed_message_ids: List[str] = []
+    created_groups: Dict[str, Tuple[str, str]] = {}
+
+    def assign_created_groups() -> None:
+        # accounts and permission sets are resolved once for every consecutive group creation
+        if not created_groups:
+            return
+        try:
+            failed_message_ids.extend(assign_account_groups(created_groups))
+        except Exception:
+            logger.exception(f"Unable to assign {len(created_groups)} groups")
+            failed_message_ids.extend(created_groups)
+        created_groups.clear()
+
+    for record in event["Records"]:
+        message_id = record["messageId"]
+        try:
+            detail: Dict[str, Any] = json.loads(record["body"])
+        except ValueError:
+            logger.warn(f"Discarding malformed message {message_id}")
+            continue
+
+        event_name = detail.get("eventName")
+        if event_name == "CreateGroup":
+            group: Dict[str, str] = detail.get("responseElements", {}).get("group", {})
+            if not group:
+                logger.warn(f"No group found in message {message_id}")
+                continue
+            identity_store_id = detail.get("requestParameters", {}).get("identityStoreId")
+            resources.GROUP_INDEXES.put(group["groupId"], group["groupName"], identity_store_id=identity_store_id)
+            created_groups[message_id] = (group["groupId"], group["groupName"])
+            continue
+
+        if event_name == "DeleteGroup":
+            # a group deleted later in the batch is not assigned at all
+            group_id = detail.get("requestParameters", {}).get("groupId")
+            for key in [key for key, (created_id, _) in created_groups.items() if created_id == group_id]:
+                logger.info(f"Skipping group {group_id} deleted in message {message_id}")
+                del created_groups[key]
+
+        # the events before this one are applied first
+        assign_created_groups()
+
+        try:
+            if event_name == "DeleteGroup":
+                delete_group_event(detail)
+            elif event_name == "UpdateGroup":
+                update_group_event(detail)
+            elif event_name in ACCOUNT_REMOVAL_EVENTS:
+                remove_account_event(detail)
+            else:
+                logger.warn(f"Discarding unsupported event {event_name} in message {message_id}")
+        except Exception:
+            logger.exception(f"Unable to process {event_name} in message {message_id}")
+            failed_message_ids.append(message_id)
+
+    assign_created_groups()
+
+    if failed_message_ids:
+        logger.warn(f"{len(failed_message_ids)} of {len(event['Records'])} messages failed")
+
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failed_message_ids]}
+
+
+def _organizational_assignments(
+    account_id: str, organizational_groups: Dict[str, str], permission_set_arns: Dict[str, Optional[str]]
+) -> List[resources.AccountAssignment]:
+    assignments: List[resources.AccountAssignment] = []
+    for group_id, group_name in organizational_groups.items():
+        _, permission_set_name = parse_group(group_name)
+
+        permission_set_arn = permission_set_arns.get(permission_set_name)
+        if not permission_set_arn:
+            logger.error(f"Permission Set '{permission_set_name}' not found, skipping")
+            continue
+
+        logger.info(f"Assigning {group_name} permission set {permission_set_name} in {account_id}")
+        assignments.append(
+            resources.AccountAssignment(
+                account_id=account_id, permission_set_arn=permission_set_arn, principal_id=group_id
+            )
+        )
+    return assignments
+
+
+def assign_organizational_groups(session: "boto3.Session", account_id: str) -> resources.AssignmentReport:
+    """
+    Assign every organizational group to a new account, in every SSO instance
+    """
+    # keep the account directory used by CreateGroup events current with the new account
+    resources.Organizations(session).refresh_account(account_id)
+
+    sso = resources.SSO(session)
+
+    results: List[resources.AssignmentResult] = []
+
+    instances = sso.list_instances()
     for instance in instances:
         instance_arn = instance["InstanceArn"]
+        identity_store_id = instance["IdentityStoreId"]
 
-        permission_set_arn = sso.get_permission_set_arn(instance_arn=instance_arn, name=permission_set_name)
-        if permission_set_arn:
-            logger.info(f"Assigning {group_name} permission set {permission_set_name} in {account_id}")
-            sso.create_account_assignment(
-                account_id=account_id,
-                instance_arn=instance_arn,
-                permission_set_arn=permission_set_arn,
-                principal_id=group_id,
-            )
-            break
+        identity_store = resources.IdentityStore(session, identity_store_id)
+        # groups created or deleted through another execution environment are not in this one's index
+        organizational_groups = identity_store.get_groups_by_prefix(GROUP_ORG_PREFIX, rebuild=True)
 
-    if not permission_set_arn:
-        logger.warn(f"Permission Set '{permission_set_name}' not found")
+        logger.info(f"Found organizational groups: {organizational_groups}")
+
+        permission_set_arns = {
+            permission_set_name: sso.get_permission_set_arn(instance_arn=instance_arn, name=permission_set_name)
+            for permission_set_name in {parse_group(group_name)[1] for group_name in organizational_groups.values()}
+        }
+        assignments = _organizational_assignments(account_id, organizational_groups, permission_set_arns)
+
+        report = sso.create_account_assignments(instance_arn, assignments)
+        results.extend(report.results)
+
+    return resources.AssignmentReport(results)
+
+
+async def assign_organizational_groups_async(session: "boto3.Session", account_id: str) -> resources.AssignmentReport:
+    """
+    Same as assign_organizational_groups, the account directory is refreshed while the groups are assigned
+    """
+    import asyncio
+
+    async def assign() -> List[resources.AssignmentResult]:
+        sso = resources.AsyncSSO(session)
+
+        results: List[resources.AssignmentResult] = []
+
+        for instance in await sso.list_instances():
+            instance_arn = instance["InstanceArn"]
+            identity_store_id = instance["IdentityStoreId"]
+
+            identity_store = resources.AsyncIdentityStore(session, identity_store_id)
+            organizational_groups = await identity_store.get_groups_by_prefix(GROUP_ORG_PREFIX, rebuild=True)
+
+            logger.info(f"Found organizational groups: {organizational_groups}")
+
+            permission_set_arns = {}
+            for permission_set_name in {parse_group(group_name)[1] for group_name in organizational_groups.values()}:
+                permission_set_arns[permission_set_name] = await sso.get_permission_set_arn(
+                    instance_arn=instance_arn, name=permission_set_name
+                )
+            assignments = _organizational_assignments(account_id, organizational_groups, permission_set_arns)
+
+            report = await sso.create_account_assignments(instance_arn, assignments)
+            results.extend(report.results)
+
+        return results
+
+    _, results = await asyncio.gather(resources.AsyncOrganizations(session).refresh_account(account_id), assign())
+    return resources.AssignmentReport(results)
 
 
 @tracer.capture_lambda_handler(capture_response=False)
 @logger.inject_lambda_context(log_event=True)
-def handler(event: Dict[str, Any], context: LambdaContext) -> None:
+@api_metrics
+def handler(event: Dict[str, Any], context: LambdaContext) -> Optional[Dict[str, Any]]:
+    set_deadline(context)
+
+    # Converge every account with the organizational groups, ex. after adding a group
+    if event.get("Action") == "Reconcile":
+        summary = reconcile(get_default_session(), dry_run=bool(event.get("DryRun")), prune=bool(event.get("Prune")))
+        logger.info("Reconciled organizational groups", extra={"summary": summary.to_dict()})
+        if summary.failed:
+            raise Exception(f"Failed to reconcile {len(summary.failed)} account assignments")
+        return summary.to_dict()
+
+    # Group events delivered in batches through the queue
+    if "Records" in event:
+        return group_batch_event(event)
+
     # Handle single-account groups
     if event.get("eventName") == "CreateGroup":
         return create_group_event(event)
+    if event.get("eventName") == "DeleteGroup":
+        return delete_group_event(event)
+    if event.get("eventName") == "UpdateGroup":
+        return update_group_event(event)
+    if event.get("eventName") in ACCOUNT_REMOVAL_EVENTS:
+        return remove_account_event(event)
 
     # Below handles organizational groups
 
@@ -101,31 +435,14 @@ def handler(event: Dict[str, Any], context: LambdaContext) -> None:
 
     logger.info(f"Assigning organizational groups to account {account_id}")
 
-    session = boto3.Session()
-    sso = SSO(session)
+    session = get_default_session()
 
-    instances = sso.list_instances()
-    for instance in instances:
-        instance_arn = instance["InstanceArn"]
-        identity_store_id = instance["IdentityStoreId"]
+    if async_enabled():
+        report = run_async(assign_organizational_groups_async(session, account_id))
+    else:
+        report = assign_organizational_groups(session, account_id)
 
-        identity_store = IdentityStore(session, identity_store_id)
-        organizational_groups = identity_store.get_groups_by_prefix(GROUP_ORG_PREFIX)
+    if report.failed:
+        raise Exception(f"Failed to assign {len(report.failed)} organizational groups to account {account_id}")
 
-        logger.info(f"Found organizational groups: {organizational_groups}")
-
-        for group_id, group_name in organizational_groups.items():
-            _, permission_set_name = parse_group(group_name)
-
-            permission_set_arn = sso.get_permission_set_arn(instance_arn=instance_arn, name=permission_set_name)
-            if not permission_set_arn:
-                logger.error(f"Permission Set '{permission_set_name}' not found, skipping")
-                continue
-
-            logger.info(f"Assigning {group_name} permission set {permission_set_name} in {account_id}")
-            sso.create_account_assignment(
-                account_id=account_id,
-                instance_arn=instance_arn,
-                permission_set_arn=permission_set_arn,
-                principal_id=group_id,
-            )
+    return {"Assignments": report.to_dict()}
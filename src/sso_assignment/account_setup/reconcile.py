@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple, TYPE_CHECKING
+
+from aws_lambda_powertools import Logger
+
+from . import resources
+from .constants import GROUP_ORG_PREFIX
+from .resources.sso import CREATE, DELETE
+from .throttling import remaining_time
+from .utils import parse_group
+
+if TYPE_CHECKING:
+    import boto3
+
+__all__ = ["ReconcileSummary", "diff_group_assignments", "enrolled_account_ids", "reconcile"]
+
+logger = Logger(child=True)
+
+# assignments submitted and awaited together
+RECONCILE_BATCH_SIZE = 100
+
+# stop submitting new batches once less time than this is left in the invocation
+RECONCILE_TIME_MARGIN = 30.0  # seconds
+
+
+@dataclass
+class ReconcileSummary:
+    dry_run: bool = False
+    prune: bool = False
+    created: int = 0
+    deleted: int = 0
+    in_progress: int = 0
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+    incomplete: bool = False
+
+    def add(self, report: "resources.AssignmentReport") -> None:
+        for result in report.succeeded:
+            if result.action == CREATE:
+                self.created += 1
+            else:
+                self.deleted += 1
+        self.in_progress += len(report.in_progress)
+        self.failed.extend(result.to_dict() for result in report.failed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "DryRun": self.dry_run,
+            "Prune": self.prune,
+            "Created": self.created,
+            "Deleted": self.deleted,
+            "InProgress": self.in_progress,
+            "Failed": self.failed,
+            "Incomplete": self.incomplete,
+        }
+
+
+def _batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def enrolled_account_ids(session: "boto3.Session") -> List[str]:
+    """
+    Return the active accounts enrolled in Control Tower, never the management account
+    """
+    organizations = resources.Organizations(session)
+    directory = organizations.get_directory()
+    management_account_id = organizations.get_management_account_id()
+
+    enrolled: Set[str] = set()
+    for ou_id in resources.ControlTower(session).list_registered_ou_ids():
+        enrolled.update(organizations.list_account_ids_for_parent(ou_id))
+    enrolled.discard(management_account_id)
+
+    account_ids = [account_id for account_id in directory.account_ids() if account_id in enrolled]
+    logger.info(f"Reconciling {len(account_ids)} of {len(directory)} active accounts enrolled in Control Tower")
+    return account_ids
+
+
+def diff_group_assignments(
+    sso: "resources.SSO",
+    instance_arn: str,
+    group_id: str,
+    permission_set_arn: str,
+    account_ids: List[str],
+    prune: bool = False,
+) -> Iterator[Tuple[str, "resources.AccountAssignment"]]:
+    """
+    Yield the changes that assign the group its permission set in the accounts.
+
+    Only assignments of the group's own permission set are compared, assignments of other permission sets are
+    left alone. Assignments outside of the accounts are only deleted when pruning.
+    """
+    wanted = set(account_ids)
+
+    # only the accounts this group already has its permission set in are kept in memory
+    assigned = set()
+    extra: List[resources.AccountAssignment] = []
+    for assignment in sso.list_group_assignments(instance_arn, group_id):
+        if assignment.permission_set_arn != permission_set_arn:
+            continue
+        if assignment.account_id in wanted:
+            assigned.add(assignment.account_id)
+        elif prune:
+            extra.append(assignment)
+
+    for assignment in extra:
+        yield DELETE, assignment
+
+    for account_id in account_ids:
+        if account_id not in assigned:
+            yield CREATE, resources.AccountAssignment(
+                account_id=account_id, permission_set_arn=permission_set_arn, principal_id=group_id
+            )
+
+
+def reconcile(session: "boto3.Session", dry_run: bool = False, prune: bool = False) -> ReconcileSummary:
+    """
+    Converge the organizational group assignments of every enrolled account
+    """
+    summary = ReconcileSummary(dry_run=dry_run, prune=prune)
+
+    account_ids = enrolled_account_ids(session)
+    sso = resources.SSO(session)
+
+    for instance in sso.list_instances():
+        instance_arn = instance["InstanceArn"]
+
+        identity_store = resources.IdentityStore(session, instance["IdentityStoreId"])
+        organizational_groups = identity_store.get_groups_by_prefix(GROUP_ORG_PREFIX)
+
+        for group_id, group_name in organizational_groups.items():
+            _, permission_set_name = parse_group(group_name)
+
+            permission_set_arn = sso.get_permission_set_arn(instance_arn=instance_arn, name=permission_set_name)
+            if not permission_set_arn:
+                logger.error(f"Permission Set '{permission_set_name}' not found, skipping {group_name}")
+                continue
+
+            changes = diff_group_assignments(sso, instance_arn, group_id, permission_set_arn, account_ids, prune=prune)
+            for batch in _batched(changes, RECONCILE_BATCH_SIZE):
+                invocation_remaining = remaining_time()
+                if invocation_remaining is not None and invocation_remaining < RECONCILE_TIME_MARGIN:
+                    logger.warning("Stopping reconciliation, the invocation is running out of time")
+                    summary.incomplete = True
+                    return summary
+
+                creates = [assignment for action, assignment in batch if action == CREATE]
+                deletes = [assignment for action, assignment in batch if action == DELETE]
+                logger.info(f"{group_name}: {len(creates)} assignments to create, {len(deletes)} to delete")
+
+                if dry_run:
+                    summary.created += len(creates)
+                    summary.deleted += len(deletes)
+                    continue
+
+                if deletes:
+                    summary.add(sso.delete_account_assignments(instance_arn, deletes))
+                if creates:
+                    summary.add(sso.create_account_assignments(instance_arn, creates))
+
+    return summary
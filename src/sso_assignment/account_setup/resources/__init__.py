@@ -19,8 +19,48 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from .identity_store import IdentityStore
-from .organizations import Organizations
-from .sso import SSO
+from importlib import import_module
+from typing import Any, TYPE_CHECKING
 
-__all__ = ["IdentityStore", "Organizations", "SSO"]
+if TYPE_CHECKING:
+    from .controltower import ControlTower
+    from .identity_store import AsyncIdentityStore, GROUP_INDEXES, IdentityStore
+    from .organizations import AsyncOrganizations, Organizations
+    from .sso import AccountAssignment, AssignmentIndex, AssignmentReport, AssignmentResult, AsyncSSO, SSO
+
+__all__ = [
+    "AccountAssignment",
+    "AssignmentIndex",
+    "AssignmentReport",
+    "AssignmentResult",
+    "AsyncIdentityStore",
+    "AsyncOrganizations",
+    "AsyncSSO",
+    "ControlTower",
+    "GROUP_INDEXES",
+    "IdentityStore",
+    "Organizations",
+    "SSO",
+]
+
+# resource modules are imported on first use, not every code path needs all of them
+_MODULES = {
+    "AccountAssignment": ".sso",
+    "AssignmentIndex": ".sso",
+    "AssignmentReport": ".sso",
+    "AssignmentResult": ".sso",
+    "AsyncIdentityStore": ".identity_store",
+    "AsyncOrganizations": ".organizations",
+    "AsyncSSO": ".sso",
+    "ControlTower": ".controltower",
+    "GROUP_INDEXES": ".identity_store",
+    "IdentityStore": ".identity_store",
+    "Organizations": ".organizations",
+    "SSO": ".sso",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _MODULES:
+        return getattr(import_module(_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from typing import List, TYPE_CHECKING
+
+from aws_lambda_powertools import Logger
+
+from ..clients import get_client
+
+if TYPE_CHECKING:
+    import boto3
+
+__all__ = ["ControlTower"]
+
+logger = Logger(child=True)
+
+
+class ControlTower:
+    def __init__(self, session: "boto3.Session") -> None:
+        # Control Tower is only available in the home region of the landing zone
+        self.client = get_client(session, "controltower")
+
+    def list_registered_ou_ids(self) -> List[str]:
+        """
+        Return the IDs of the organizational units registered with Control Tower
+
+        Registering an OU enables the AWSControlTowerBaseline on it, the other baselines target accounts.
+        """
+        ou_ids: List[str] = []
+
+        paginator = self.client.get_paginator("list_enabled_baselines")
+        for page in paginator.paginate():
+            for baseline in page.get("enabledBaselines", []):
+                # arn:aws:organizations::<management account ID>:ou/o-<organization ID>/ou-<OU ID>
+                target = baseline["targetIdentifier"]
+                if ":ou/" in target and baseline.get("statusSummary", {}).get("status") == "SUCCEEDED":
+                    ou_ids.append(target.rsplit("/", 1)[-1])
+
+        logger.debug(f"Found {len(ou_ids)} organizational units registered with Control Tower")
+        return ou_ids
@@ -19,24 +19,123 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from typing import Dict, TYPE_CHECKING
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
 
-import boto3
+from aws_lambda_powertools import Logger
+import botocore
+
+from ..aio import get_async_client
+from ..clients import get_client
 
 if TYPE_CHECKING:
+    import boto3
     from mypy_boto3_identitystore import IdentityStoreClient, ListGroupsPaginator
 
-__all__ = ["IdentityStore"]
+__all__ = ["AsyncIdentityStore", "GROUP_INDEXES", "GroupIndexes", "IdentityStore"]
+
+logger = Logger(child=True)
+
+# seconds between full rebuilds of a group index, group events keep it current in between. Only the
+# execution environment that consumes an event sees it, so new accounts always rebuild the index.
+GROUP_INDEX_TTL = 3600
+
+
+class GroupIndex:
+    """
+    Display names of the groups in an identity store that start with a prefix, keyed by group ID
+    """
+
+    def __init__(self, prefix: str, groups: Dict[str, str], ttl: float = GROUP_INDEX_TTL) -> None:
+        self.prefix = prefix
+        self.expires = time.monotonic() + ttl
+        self._groups = groups
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires
+
+    def put(self, group_id: str, display_name: str) -> None:
+        if display_name.startswith(self.prefix):
+            self._groups[group_id] = display_name
+        else:
+            # renamed away from the prefix
+            self._groups.pop(group_id, None)
+
+    def remove(self, group_id: str) -> None:
+        self._groups.pop(group_id, None)
+
+    def groups(self) -> Dict[str, str]:
+        return dict(self._groups)
+
+
+class GroupIndexes:
+    """
+    Group indexes shared by every invocation in the execution environment, keyed by identity store and prefix
+    """
+
+    def __init__(self) -> None:
+        self._indexes: Dict[Tuple[str, str], GroupIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, identity_store_id: str, prefix: str) -> Optional[GroupIndex]:
+        with self._lock:
+            index = self._indexes.get((identity_store_id, prefix))
+            if index and index.expired:
+                del self._indexes[(identity_store_id, prefix)]
+                return None
+            return index
+
+    def set(self, identity_store_id: str, index: GroupIndex) -> None:
+        with self._lock:
+            self._indexes[(identity_store_id, index.prefix)] = index
+
+    def put(self, group_id: str, display_name: str, identity_store_id: Optional[str] = None) -> None:
+        """
+        Record a created or renamed group in the indexes of an identity store, or all of them
+        """
+        with self._lock:
+            for (store_id, _), index in self._indexes.items():
+                if identity_store_id in (None, store_id):
+                    index.put(group_id, display_name)
+
+    def remove(self, group_id: str) -> None:
+        with self._lock:
+            for index in self._indexes.values():
+                index.remove(group_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+GROUP_INDEXES = GroupIndexes()
 
 
 class IdentityStore:
-    def __init__(self, session: boto3.Session, identity_store_id: str) -> None:
-        self.client: IdentityStoreClient = session.client("identitystore")
+    def __init__(self, session: "boto3.Session", identity_store_id: str) -> None:
+        self.client: IdentityStoreClient = get_client(session, "identitystore")
         self._identity_store_id = identity_store_id
 
-    def get_groups_by_prefix(self, prefix: str) -> Dict[str, str]:
+    def get_groups_by_prefix(self, prefix: str, rebuild: bool = False) -> Dict[str, str]:
         """
         Return all of the groups that match a given prefix
+
+        The index only sees the group events of this execution environment, rebuild it when a stale
+        view is not acceptable.
+        """
+        index = None if rebuild else GROUP_INDEXES.get(self._identity_store_id, prefix)
+        if not index:
+            index = GroupIndex(prefix, self.list_groups_by_prefix(prefix))
+            GROUP_INDEXES.set(self._identity_store_id, index)
+            logger.debug(f"Indexed {len(index.groups())} groups starting with {prefix} in {self._identity_store_id}")
+
+        return index.groups()
+
+    def list_groups_by_prefix(self, prefix: str) -> Dict[str, str]:
+        """
+        Scan the identity store for the groups that match a given prefix
         """
         paginator: ListGroupsPaginator = self.client.get_paginator("list_groups")
         page_iterator = paginator.paginate(
@@ -53,3 +152,71 @@ class IdentityStore:
                     groups[group["GroupId"]] = group["DisplayName"]
 
         return groups
+
+    def refresh_group(self, group_id: str) -> Optional[str]:
+        """
+        Update the indexes with the current display name of a group, returning the name
+        """
+        try:
+            response = self.client.describe_group(IdentityStoreId=self._identity_store_id, GroupId=group_id)
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise error
+            return None
+
+        display_name = response["DisplayName"]
+        GROUP_INDEXES.put(group_id, display_name, identity_store_id=self._identity_store_id)
+        return display_name
+
+
+class AsyncIdentityStore:
+    """
+    IdentityStore on aiobotocore, sharing the group indexes with IdentityStore
+    """
+
+    def __init__(self, session: "boto3.Session", identity_store_id: str) -> None:
+        self.session = session
+        self._identity_store_id = identity_store_id
+
+    async def _client(self) -> Any:
+        return await get_async_client(self.session, "identitystore")
+
+    async def get_groups_by_prefix(self, prefix: str, rebuild: bool = False) -> Dict[str, str]:
+        index = None if rebuild else GROUP_INDEXES.get(self._identity_store_id, prefix)
+        if not index:
+            index = GroupIndex(prefix, await self.list_groups_by_prefix(prefix))
+            GROUP_INDEXES.set(self._identity_store_id, index)
+            logger.debug(f"Indexed {len(index.groups())} groups starting with {prefix} in {self._identity_store_id}")
+
+        return index.groups()
+
+    async def list_groups_by_prefix(self, prefix: str) -> Dict[str, str]:
+        paginator = (await self._client()).get_paginator("list_groups")
+        page_iterator = paginator.paginate(
+            IdentityStoreId=self._identity_store_id,
+            PaginationConfig={
+                "PageSize": 100,
+            },
+        )
+
+        groups: Dict[str, str] = {}
+        async for page in page_iterator:
+            for group in page.get("Groups", []):
+                if group["DisplayName"].startswith(prefix):
+                    groups[group["GroupId"]] = group["DisplayName"]
+
+        return groups
+
+    async def refresh_group(self, group_id: str) -> Optional[str]:
+        try:
+            response = await (await self._client()).describe_group(
+                IdentityStoreId=self._identity_store_id, GroupId=group_id
+            )
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise error
+            return None
+
+        display_name = response["DisplayName"]
+        GROUP_INDEXES.put(group_id, display_name, identity_store_id=self._identity_store_id)
+        return display_name
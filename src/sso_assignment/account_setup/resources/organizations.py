@@ -19,35 +19,251 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from functools import lru_cache
-from typing import Optional, TYPE_CHECKING
+from dataclasses import dataclass
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, TYPE_CHECKING
 
-import boto3
+from aws_lambda_powertools import Logger
+import botocore
+
+from ..aio import get_async_client
+from ..clients import get_client
 
 if TYPE_CHECKING:
+    import boto3
     from mypy_boto3_organizations import OrganizationsClient, ListAccountsPaginator
 
-__all__ = ["Organizations"]
+__all__ = ["Account", "AsyncOrganizations", "Organizations"]
+
+logger = Logger(child=True)
+
+# seconds the account directory is reused before it is rebuilt
+ACCOUNT_DIRECTORY_TTL = 900
+
+# seconds before an unknown account name rebuilds the directory again, bounds the scans for misspelled names
+ACCOUNT_DIRECTORY_MIN_AGE = 60
+
+
+@dataclass(frozen=True, slots=True)
+class Account:
+    id: str
+    name: str
+    email: str
+
+
+class AccountDirectory:
+    """
+    Active accounts of the organization, indexed by ID, name and email
+    """
+
+    def __init__(self, accounts: Iterable[Account], ttl: float = ACCOUNT_DIRECTORY_TTL) -> None:
+        self.created = time.monotonic()
+        self.expires = self.created + ttl
+        self._by_id: Dict[str, Account] = {}
+        self._by_name: Dict[str, str] = {}
+        self._by_email: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for account in accounts:
+            self._add(account)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires
+
+    @property
+    def rebuildable(self) -> bool:
+        return time.monotonic() - self.created >= ACCOUNT_DIRECTORY_MIN_AGE
+
+    def _add(self, account: Account) -> None:
+        self._by_id[account.id] = account
+        self._by_name[account.name] = account.id
+        self._by_email[account.email.lower()] = account.id
+
+    def _remove(self, account_id: str) -> None:
+        account = self._by_id.pop(account_id, None)
+        if account:
+            self._by_name.pop(account.name, None)
+            self._by_email.pop(account.email.lower(), None)
+
+    def put(self, account: Account) -> None:
+        with self._lock:
+            # drop the previous name and email in case the account was renamed
+            self._remove(account.id)
+            self._add(account)
+
+    def remove(self, account_id: str) -> None:
+        with self._lock:
+            self._remove(account_id)
+
+    def account_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._by_id)
+
+    def get(self, account_id: str) -> Optional[Account]:
+        return self._by_id.get(account_id)
+
+    def get_by_name(self, name: str) -> Optional[Account]:
+        return self._by_id.get(self._by_name.get(name, ""))
+
+    def get_by_email(self, email: str) -> Optional[Account]:
+        return self._by_id.get(self._by_email.get(email.lower(), ""))
+
+
+# shared by every invocation in the execution environment
+_DIRECTORY: Optional[AccountDirectory] = None
+_DIRECTORY_LOCK = threading.Lock()
+
+
+def _update_directory(directory: AccountDirectory, account_id: str, account: Mapping[str, Any]) -> Optional[Account]:
+    if account["Status"] != "ACTIVE":
+        directory.remove(account_id)
+        return None
+
+    entry = Account(id=account["Id"], name=account["Name"], email=account["Email"])
+    directory.put(entry)
+    logger.debug(f"Refreshed account {account_id} ({entry.name}) in the account directory")
+    return entry
 
 
 class Organizations:
-    def __init__(self, session: boto3.Session) -> None:
+    def __init__(self, session: "boto3.Session") -> None:
         # @see https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/organizations.html
-        self.client: OrganizationsClient = session.client(
+        self.client: OrganizationsClient = get_client(
+            session,
             "organizations",
             region_name="us-east-1",
             endpoint_url="https://organizations.us-east-1.amazonaws.com",
         )
 
-    @lru_cache
-    def get_account_id(self, name: str) -> Optional[str]:
+    def list_active_accounts(self) -> Iterable[Account]:
         """
-        Return the account ID
+        Yield every active account in the organization
         """
         paginator: ListAccountsPaginator = self.client.get_paginator("list_accounts")
-        page_iterator = paginator.paginate(PaginationConfig={"PageSize": 100})
+        page_iterator = paginator.paginate(PaginationConfig={"PageSize": 20})
         for page in page_iterator:
             for account in page.get("Accounts", []):
-                if account["Name"] == name and account["Status"] == "ACTIVE":
-                    return account["Id"]
-        return None
+                if account["Status"] == "ACTIVE":
+                    yield Account(id=account["Id"], name=account["Name"], email=account["Email"])
+
+    def get_management_account_id(self) -> str:
+        """
+        Return the ID of the management account of the organization
+        """
+        response = self.client.describe_organization()
+        return response["Organization"]["MasterAccountId"]
+
+    def list_account_ids_for_parent(self, parent_id: str) -> List[str]:
+        """
+        Return the IDs of the accounts directly under a root or organizational unit
+        """
+        account_ids: List[str] = []
+
+        paginator = self.client.get_paginator("list_accounts_for_parent")
+        for page in paginator.paginate(ParentId=parent_id):
+            account_ids.extend(account["Id"] for account in page.get("Accounts", []))
+
+        return account_ids
+
+    def get_directory(self, rebuild: bool = False) -> AccountDirectory:
+        """
+        Return the account directory, building it with a single scan when missing or expired
+        """
+        global _DIRECTORY
+
+        with _DIRECTORY_LOCK:
+            if _DIRECTORY is None or _DIRECTORY.expired or (rebuild and _DIRECTORY.rebuildable):
+                _DIRECTORY = AccountDirectory(self.list_active_accounts())
+                logger.debug(f"Indexed {len(_DIRECTORY)} active accounts")
+            return _DIRECTORY
+
+    def get_account_id(self, name: str) -> Optional[str]:
+        """
+        Return the account ID, rebuilding the directory once when the name is unknown
+        """
+        account = self.get_directory().get_by_name(name)
+        if account is None:
+            # the account may have been created or renamed since the directory was built
+            account = self.get_directory(rebuild=True).get_by_name(name)
+        return account.id if account else None
+
+    def refresh_account(self, account_id: str) -> Optional[Account]:
+        """
+        Update a single account in an existing directory without rescanning the organization
+        """
+        with _DIRECTORY_LOCK:
+            directory = _DIRECTORY
+        if directory is None or directory.expired:
+            # the next lookup rebuilds the directory, including this account
+            return None
+
+        account: Mapping[str, Any]
+        try:
+            account = self.client.describe_account(AccountId=account_id)["Account"]
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] != "AccountNotFoundException":
+                raise error
+            account = {"Id": account_id, "Status": "SUSPENDED"}
+
+        return _update_directory(directory, account_id, account)
+
+
+class AsyncOrganizations:
+    """
+    Organizations on aiobotocore, sharing the account directory with Organizations
+    """
+
+    def __init__(self, session: "boto3.Session") -> None:
+        self.session = session
+
+    async def _client(self) -> Any:
+        # us-east-1 resolves to https://organizations.us-east-1.amazonaws.com
+        return await get_async_client(self.session, "organizations", region_name="us-east-1")
+
+    async def list_active_accounts(self) -> AsyncIterator[Account]:
+        paginator = (await self._client()).get_paginator("list_accounts")
+        async for page in paginator.paginate(PaginationConfig={"PageSize": 20}):
+            for account in page.get("Accounts", []):
+                if account["Status"] == "ACTIVE":
+                    yield Account(id=account["Id"], name=account["Name"], email=account["Email"])
+
+    async def get_directory(self, rebuild: bool = False) -> AccountDirectory:
+        """
+        Return the account directory, the lock is not held while the organization is scanned
+        """
+        global _DIRECTORY
+
+        with _DIRECTORY_LOCK:
+            directory = _DIRECTORY
+        if directory is None or directory.expired or (rebuild and directory.rebuildable):
+            directory = AccountDirectory([account async for account in self.list_active_accounts()])
+            logger.debug(f"Indexed {len(directory)} active accounts")
+            with _DIRECTORY_LOCK:
+                _DIRECTORY = directory
+        return directory
+
+    async def get_account_id(self, name: str) -> Optional[str]:
+        account = (await self.get_directory()).get_by_name(name)
+        if account is None:
+            account = (await self.get_directory(rebuild=True)).get_by_name(name)
+        return account.id if account else None
+
+    async def refresh_account(self, account_id: str) -> Optional[Account]:
+        with _DIRECTORY_LOCK:
+            directory = _DIRECTORY
+        if directory is None or directory.expired:
+            return None
+
+        account: Mapping[str, Any]
+        try:
+            account = (await (await self._client()).describe_account(AccountId=account_id))["Account"]
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] != "AccountNotFoundException":
+                raise error
+            account = {"Id": account_id, "Status": "SUSPENDED"}
+
+        return _update_directory(directory, account_id, account)
@@ -19,32 +19,293 @@
 * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from functools import lru_cache
-from typing import Optional, Dict, Any, TYPE_CHECKING
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
+import threading
+import time
+from typing import Optional, Dict, Any, AsyncIterator, Iterable, Iterator, List, Mapping, Set, TYPE_CHECKING
 
 from aws_lambda_powertools import Logger
-import boto3
 import botocore
 
+from ..aio import get_async_client
+from ..clients import get_client
+from ..throttling import remaining_time
+
 if TYPE_CHECKING:
-    from mypy_boto3_sso_admin import SSOAdminClient, ListInstancesPaginator, ListPermissionSetsPaginator
+    import boto3
+    from mypy_boto3_sso_admin import (
+        SSOAdminClient,
+        ListAccountAssignmentsForPrincipalPaginator,
+        ListAccountAssignmentsPaginator,
+        ListInstancesPaginator,
+        ListPermissionSetsPaginator,
+        ListPermissionSetsProvisionedToAccountPaginator,
+    )
+    from mypy_boto3_sso_admin.literals import PrincipalTypeType
+    from mypy_boto3_sso_admin.type_defs import AccountAssignmentOperationStatusTypeDef, InstanceMetadataTypeDef
 
-__all__ = ["SSO"]
+__all__ = ["AccountAssignment", "AssignmentIndex", "AssignmentReport", "AssignmentResult", "AsyncSSO", "SSO"]
 
 logger = Logger(child=True)
 
+# seconds a permission set index is reused before it is rebuilt
+PERMISSION_SET_TTL = 300
+
+# seconds the assignments read for a group or account are trusted before they are read again
+ASSIGNMENT_INDEX_TTL = 3600
+
+MAX_DESCRIBE_WORKERS = 8
+
+# assignment requests in flight at once, the rate limiter paces the calls themselves
+MAX_ASSIGNMENT_WORKERS = 8
+
+STATUS_POLL_DELAY = 1.0  # seconds
+MAX_STATUS_POLL_DELAY = 8.0  # seconds
+STATUS_POLL_TIMEOUT = 120.0  # seconds
+
+IN_PROGRESS = "IN_PROGRESS"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+
+CREATE = "CREATE"
+DELETE = "DELETE"
+
+# operation, request ID parameter and response key used to poll the status of each action
+_STATUS_OPERATIONS = {
+    CREATE: (
+        "describe_account_assignment_creation_status",
+        "AccountAssignmentCreationRequestId",
+        "AccountAssignmentCreationStatus",
+    ),
+    DELETE: (
+        "describe_account_assignment_deletion_status",
+        "AccountAssignmentDeletionRequestId",
+        "AccountAssignmentDeletionStatus",
+    ),
+}
+
+
+class PermissionSetIndex:
+    """
+    Permission set names and ARNs of an SSO instance, filled in as permission sets are described
+    """
+
+    def __init__(self, ttl: float = PERMISSION_SET_TTL) -> None:
+        self.expires = time.monotonic() + ttl
+        self.names: Dict[str, str] = {}
+        self.arns: Dict[str, str] = {}
+        self.complete = False
+        self.lock = threading.Lock()
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires
+
+    def add(self, name: str, arn: str) -> None:
+        self.names[name] = arn
+        self.arns[arn] = name
+
+
+# shared by every invocation in the execution environment, keyed by instance ARN
+_INDEXES: Dict[str, PermissionSetIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_permission_set_index(instance_arn: str) -> PermissionSetIndex:
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(instance_arn)
+        if not index or index.expired:
+            index = _INDEXES[instance_arn] = PermissionSetIndex()
+        return index
+
+
+@dataclass(frozen=True)
+class AccountAssignment:
+    account_id: str
+    permission_set_arn: str
+    principal_id: str
+    principal_type: "PrincipalTypeType" = "GROUP"
+
+
+class AssignmentIndex:
+    """
+    Account assignments of an SSO instance indexed by principal and by account.
+
+    Assignments created or deleted through this class are recorded as they complete, and the assignments read
+    for a principal or account replace the recorded ones. Assignments made by other execution environments are
+    missing, so the index is only a hint that complements the listed assignments.
+    """
+
+    def __init__(self, ttl: float = ASSIGNMENT_INDEX_TTL) -> None:
+        self.expires = time.monotonic() + ttl
+        self._by_principal: Dict[str, Set[AccountAssignment]] = defaultdict(set)
+        self._by_account: Dict[str, Set[AccountAssignment]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires
+
+    def _add(self, assignment: AccountAssignment) -> None:
+        self._by_principal[assignment.principal_id].add(assignment)
+        self._by_account[assignment.account_id].add(assignment)
+
+    def _discard(self, assignment: AccountAssignment) -> None:
+        self._by_principal[assignment.principal_id].discard(assignment)
+        self._by_account[assignment.account_id].discard(assignment)
+
+    def add(self, assignment: AccountAssignment) -> None:
+        with self._lock:
+            self._add(assignment)
+
+    def discard(self, assignment: AccountAssignment) -> None:
+        with self._lock:
+            self._discard(assignment)
+
+    def load_principal(self, principal_id: str, assignments: Iterable[AccountAssignment]) -> None:
+        with self._lock:
+            for assignment in list(self._by_principal[principal_id]):
+                self._discard(assignment)
+            for assignment in assignments:
+                self._add(assignment)
+
+    def load_account(self, account_id: str, assignments: Iterable[AccountAssignment]) -> None:
+        with self._lock:
+            for assignment in list(self._by_account[account_id]):
+                self._discard(assignment)
+            for assignment in assignments:
+                self._add(assignment)
+
+    def for_principal(self, principal_id: str) -> List[AccountAssignment]:
+        """
+        Return the recorded assignments of a principal
+        """
+        with self._lock:
+            return list(self._by_principal[principal_id])
+
+    def for_account(self, account_id: str) -> List[AccountAssignment]:
+        """
+        Return the recorded assignments in an account
+        """
+        with self._lock:
+            return list(self._by_account[account_id])
+
+
+# shared by every invocation in the execution environment, keyed by instance ARN
+_ASSIGNMENT_INDEXES: Dict[str, AssignmentIndex] = {}
+
+
+def get_assignment_index(instance_arn: str) -> AssignmentIndex:
+    with _INDEXES_LOCK:
+        index = _ASSIGNMENT_INDEXES.get(instance_arn)
+        if not index or index.expired:
+            index = _ASSIGNMENT_INDEXES[instance_arn] = AssignmentIndex()
+        return index
+
+
+@dataclass
+class AssignmentResult:
+    assignment: AccountAssignment
+    status: str
+    action: str = CREATE
+    request_id: Optional[str] = None
+    failure_reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "Action": self.action,
+            "AccountId": self.assignment.account_id,
+            "PermissionSetArn": self.assignment.permission_set_arn,
+            "PrincipalId": self.assignment.principal_id,
+            "PrincipalType": self.assignment.principal_type,
+            "Status": self.status,
+        }
+        if self.request_id:
+            result["RequestId"] = self.request_id
+        if self.failure_reason:
+            result["FailureReason"] = self.failure_reason
+        return result
+
+
+@dataclass
+class AssignmentReport:
+    results: List[AssignmentResult]
+
+    def _with_status(self, status: str) -> List[AssignmentResult]:
+        return [result for result in self.results if result.status == status]
+
+    @property
+    def succeeded(self) -> List[AssignmentResult]:
+        return self._with_status(SUCCEEDED)
+
+    @property
+    def failed(self) -> List[AssignmentResult]:
+        return self._with_status(FAILED)
+
+    @property
+    def in_progress(self) -> List[AssignmentResult]:
+        return self._with_status(IN_PROGRESS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "Succeeded": len(self.succeeded),
+            "Failed": [result.to_dict() for result in self.failed],
+            "InProgress": [result.to_dict() for result in self.in_progress],
+        }
+
+
+def _submitted(assignment: AccountAssignment, action: str, status: Optional[Mapping[str, Any]]) -> AssignmentResult:
+    if status is None:
+        # the assignment to delete is already gone
+        return AssignmentResult(assignment, SUCCEEDED, action=action)
+
+    return AssignmentResult(
+        assignment,
+        status["Status"],
+        action=action,
+        request_id=status.get("RequestId"),
+        failure_reason=status.get("FailureReason"),
+    )
+
+
+def _can_wait(deadline: float, delay: float) -> bool:
+    remaining = deadline - time.monotonic()
+    invocation_remaining = remaining_time()
+    if invocation_remaining is not None:
+        remaining = min(remaining, invocation_remaining)
+    return remaining >= delay
+
+
+def _record_results(instance_arn: str, results: List[AssignmentResult], action: str) -> AssignmentReport:
+    index = get_assignment_index(instance_arn)
+    for result in results:
+        if result.status == SUCCEEDED:
+            if action == CREATE:
+                index.add(result.assignment)
+            else:
+                index.discard(result.assignment)
+
+    report = AssignmentReport(results)
+    logger.info(
+        f"Account assignments ({action}): {len(report.succeeded)} succeeded, {len(report.failed)} failed, "
+        f"{len(report.in_progress)} still in progress"
+    )
+    return report
+
 
 class SSO:
-    def __init__(self, session: boto3.Session) -> None:
-        self.client: SSOAdminClient = session.client("sso-admin")
-        self._permission_sets: Dict[str, str] = {}
-        self._instances = []
+    def __init__(self, session: "boto3.Session") -> None:
+        self.client: SSOAdminClient = get_client(session, "sso-admin")
+        self._instances: List[InstanceMetadataTypeDef] = []
 
-    def list_instances(self) -> Dict[str, str]:
+    def list_instances(self) -> List["InstanceMetadataTypeDef"]:
         if self._instances:
             return self._instances
 
-        instances = []
+        instances: List[InstanceMetadataTypeDef] = []
         paginator: ListInstancesPaginator = self.client.get_paginator("list_instances")
         page_iterator = paginator.paginate()
         for page in page_iterator:
@@ -54,67 +315,364 @@ class SSO:
         return instances
 
     def list_permission_sets(self, instance_arn: str) -> Dict[str, str]:
-        if instance_arn in self._permission_sets:
-            return self._permission_sets[instance_arn]
+        index = get_permission_set_index(instance_arn)
+        with index.lock:
+            if not index.complete:
+                self._scan_permission_sets(instance_arn, index)
+            return dict(index.names)
+
+    def get_permission_set_arn(self, instance_arn: str, name: str) -> Optional[str]:
+        index = get_permission_set_index(instance_arn)
+        with index.lock:
+            if name not in index.names and not index.complete:
+                self._scan_permission_sets(instance_arn, index, stop_at=name)
+            return index.names.get(name)
 
-        permission_sets: Dict[str, str] = {}
+    def _describe_permission_set_name(self, instance_arn: str, permission_set_arn: str) -> str:
+        response = self.client.describe_permission_set(InstanceArn=instance_arn, PermissionSetArn=permission_set_arn)
+        return response["PermissionSet"]["Name"]
 
+    def _scan_permission_sets(
+        self, instance_arn: str, index: PermissionSetIndex, stop_at: Optional[str] = None
+    ) -> None:
+        """
+        Describe the permission sets missing from the index, stopping once `stop_at` has been found
+        """
         paginator: ListPermissionSetsPaginator = self.client.get_paginator("list_permission_sets")
         page_iterator = paginator.paginate(InstanceArn=instance_arn)
+
+        with ThreadPoolExecutor(max_workers=MAX_DESCRIBE_WORKERS) as executor:
+            for page in page_iterator:
+                arns: List[str] = [arn for arn in page.get("PermissionSets", []) if arn not in index.arns]
+                futures = {executor.submit(self._describe_permission_set_name, instance_arn, arn): arn for arn in arns}
+                for future in as_completed(futures):
+                    index.add(future.result(), futures[future])
+                    if stop_at and stop_at in index.names:
+                        # keep the names of describes already in flight for later lookups
+                        for pending in futures:
+                            if not pending.cancel() and not pending.exception():
+                                index.add(pending.result(), futures[pending])
+                        logger.debug(f"Found permission set {stop_at} after describing {len(index.arns)}")
+                        return
+
+        index.complete = True
+        logger.debug(f"Indexed {len(index.names)} permission sets in {instance_arn}")
+
+    def create_account_assignment(
+        self,
+        account_id: str,
+        instance_arn: str,
+        permission_set_arn: str,
+        principal_id: str,
+        principal_type: "PrincipalTypeType" = "GROUP",
+    ) -> "AccountAssignmentOperationStatusTypeDef":
+        try:
+            response = self.client.create_account_assignment(
+                InstanceArn=instance_arn,
+                TargetId=account_id,
+                TargetType="AWS_ACCOUNT",
+                PermissionSetArn=permission_set_arn,
+                PrincipalType=principal_type,
+                PrincipalId=principal_id,
+            )
+            return response["AccountAssignmentCreationStatus"]
+        except botocore.exceptions.ClientError as error:
+            # includes a ConflictException still raised after the retries, the assignment fails and is retried
+            logger.exception(f"Unable to add {permission_set_arn} to {principal_id} in {account_id}")
+            raise error
+
+    def delete_account_assignment(
+        self,
+        account_id: str,
+        instance_arn: str,
+        permission_set_arn: str,
+        principal_id: str,
+        principal_type: "PrincipalTypeType" = "GROUP",
+    ) -> Optional["AccountAssignmentOperationStatusTypeDef"]:
+        try:
+            response = self.client.delete_account_assignment(
+                InstanceArn=instance_arn,
+                TargetId=account_id,
+                TargetType="AWS_ACCOUNT",
+                PermissionSetArn=permission_set_arn,
+                PrincipalType=principal_type,
+                PrincipalId=principal_id,
+            )
+            return response["AccountAssignmentDeletionStatus"]
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] != "ResourceNotFoundException":
+                logger.exception(f"Unable to delete {permission_set_arn} from {principal_id} in {account_id}")
+                raise error
+            return None
+
+    def list_group_assignments(self, instance_arn: str, group_id: str) -> Iterator[AccountAssignment]:
+        """
+        Yield every account assignment of a group
+        """
+        paginator: ListAccountAssignmentsForPrincipalPaginator = self.client.get_paginator(
+            "list_account_assignments_for_principal"
+        )
+        page_iterator = paginator.paginate(InstanceArn=instance_arn, PrincipalId=group_id, PrincipalType="GROUP")
+
+        assignments: List[AccountAssignment] = []
         for page in page_iterator:
-            for permission_set_arn in page.get("PermissionSets", []):
-                response = self.client.describe_permission_set(
-                    InstanceArn=instance_arn, PermissionSetArn=permission_set_arn
+            for item in page.get("AccountAssignments", []):
+                assignment = AccountAssignment(
+                    account_id=item["AccountId"],
+                    permission_set_arn=item["PermissionSetArn"],
+                    principal_id=group_id,
                 )
+                assignments.append(assignment)
+                yield assignment
 
-                name = response["PermissionSet"]["Name"]
-                permission_sets[name] = permission_set_arn
+        get_assignment_index(instance_arn).load_principal(group_id, assignments)
 
-        self._permission_sets[instance_arn] = permission_sets
+    def list_assignments_in_account(self, instance_arn: str, account_id: str) -> List[AccountAssignment]:
+        """
+        Return every account assignment in an account, reading only the permission sets provisioned to it
+        """
+        paginator: ListPermissionSetsProvisionedToAccountPaginator = self.client.get_paginator(
+            "list_permission_sets_provisioned_to_account"
+        )
+        permission_set_arns: List[str] = []
+        for page in paginator.paginate(InstanceArn=instance_arn, AccountId=account_id):
+            permission_set_arns.extend(page.get("PermissionSets", []))
 
-        return permission_sets
+        def list_assignments(permission_set_arn: str) -> List[AccountAssignment]:
+            paginator: ListAccountAssignmentsPaginator = self.client.get_paginator("list_account_assignments")
+            page_iterator = paginator.paginate(
+                InstanceArn=instance_arn, AccountId=account_id, PermissionSetArn=permission_set_arn
+            )
+            return [
+                AccountAssignment(
+                    account_id=account_id,
+                    permission_set_arn=permission_set_arn,
+                    principal_id=item["PrincipalId"],
+                    principal_type=item["PrincipalType"],
+                )
+                for page in page_iterator
+                for item in page.get("AccountAssignments", [])
+            ]
 
-    @lru_cache
-    def get_permission_set_arn(self, instance_arn: str, name: str) -> Optional[str]:
-        permission_sets = self.list_permission_sets(instance_arn)
-        return permission_sets.get(name)
+        with ThreadPoolExecutor(max_workers=MAX_DESCRIBE_WORKERS) as executor:
+            assignments = [
+                assignment for result in executor.map(list_assignments, permission_set_arns) for assignment in result
+            ]
 
-    def create_account_assignment(
+        get_assignment_index(instance_arn).load_account(account_id, assignments)
+        return assignments
+
+    def delete_group_assignments(self, instance_arn: str, group_id: str) -> AssignmentReport:
+        """
+        Delete every account assignment of a group, ex. after the group was deleted
+        """
+        # recorded before the listing replaces them, the listing may not show assignments just created
+        recorded = get_assignment_index(instance_arn).for_principal(group_id)
+        try:
+            listed = list(self.list_group_assignments(instance_arn, group_id))
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise error
+            logger.warning(f"Unable to list the assignments of {group_id}, deleting the {len(recorded)} recorded")
+            listed = []
+        assignments = list(dict.fromkeys(listed + recorded))
+
+        logger.info(f"Deleting {len(assignments)} account assignments of {group_id}")
+        return self.delete_account_assignments(instance_arn, assignments)
+
+    def delete_assignments_in_account(self, instance_arn: str, account_id: str) -> AssignmentReport:
+        """
+        Delete every account assignment in an account, ex. after the account was closed
+        """
+        recorded = get_assignment_index(instance_arn).for_account(account_id)
+        listed = self.list_assignments_in_account(instance_arn, account_id)
+        assignments = list(dict.fromkeys(listed + recorded))
+
+        logger.info(f"Deleting {len(assignments)} account assignments in {account_id}")
+        return self.delete_account_assignments(instance_arn, assignments)
+
+    def create_account_assignments(
+        self, instance_arn: str, assignments: Iterable[AccountAssignment]
+    ) -> AssignmentReport:
+        """
+        Submit the assignments concurrently and wait until each one reaches a final state
+        """
+        return self._apply_account_assignments(instance_arn, assignments, CREATE)
+
+    def delete_account_assignments(
+        self, instance_arn: str, assignments: Iterable[AccountAssignment]
+    ) -> AssignmentReport:
+        """
+        Delete the assignments concurrently and wait until each one reaches a final state
+        """
+        return self._apply_account_assignments(instance_arn, assignments, DELETE)
+
+    def _apply_account_assignments(
+        self, instance_arn: str, assignments: Iterable[AccountAssignment], action: str
+    ) -> AssignmentReport:
+        with ThreadPoolExecutor(max_workers=MAX_ASSIGNMENT_WORKERS) as executor:
+            results = list(executor.map(partial(self._submit_account_assignment, instance_arn, action), assignments))
+            self._wait_for_account_assignments(instance_arn, results, executor)
+
+        return _record_results(instance_arn, results, action)
+
+    def _submit_account_assignment(
+        self, instance_arn: str, action: str, assignment: AccountAssignment
+    ) -> AssignmentResult:
+        submit = self.create_account_assignment if action == CREATE else self.delete_account_assignment
+        try:
+            status = submit(
+                account_id=assignment.account_id,
+                instance_arn=instance_arn,
+                permission_set_arn=assignment.permission_set_arn,
+                principal_id=assignment.principal_id,
+                principal_type=assignment.principal_type,
+            )
+        except botocore.exceptions.ClientError as error:
+            return AssignmentResult(assignment, FAILED, action=action, failure_reason=str(error))
+
+        return _submitted(assignment, action, status)
+
+    def _wait_for_account_assignments(
+        self, instance_arn: str, results: List[AssignmentResult], executor: ThreadPoolExecutor
+    ) -> None:
+        """
+        Poll the pending assignments in batches, backing off between rounds
+        """
+        delay = STATUS_POLL_DELAY
+        timeout = time.monotonic() + STATUS_POLL_TIMEOUT
+
+        pending = [result for result in results if result.status == IN_PROGRESS]
+        while pending:
+            if not _can_wait(timeout, delay):
+                logger.warning(f"Stopped waiting for {len(pending)} account assignments still in progress")
+                return
+
+            time.sleep(delay)
+            list(executor.map(partial(self._update_account_assignment_status, instance_arn), pending))
+
+            pending = [result for result in pending if result.status == IN_PROGRESS]
+            delay = min(delay * 2, MAX_STATUS_POLL_DELAY)
+
+    def _update_account_assignment_status(self, instance_arn: str, result: AssignmentResult) -> None:
+        operation_name, request_id_key, status_key = _STATUS_OPERATIONS[result.action]
+        try:
+            response = getattr(self.client, operation_name)(
+                InstanceArn=instance_arn, **{request_id_key: result.request_id}
+            )
+        except botocore.exceptions.ClientError:
+            logger.exception(f"Unable to describe account assignment request {result.request_id}")
+            return
+
+        status = response[status_key]
+        result.status = status["Status"]
+        result.failure_reason = status.get("FailureReason")
+
+
+class AsyncSSO:
+    """
+    SSO on aiobotocore, sharing the permission set and assignment indexes with SSO
+    """
+
+    def __init__(self, session: "boto3.Session") -> None:
+        self.session = session
+        self._instances: List[InstanceMetadataTypeDef] = []
+
+    async def _client(self) -> Any:
+        return await get_async_client(self.session, "sso-admin")
+
+    async def list_instances(self) -> List["InstanceMetadataTypeDef"]:
+        if self._instances:
+            return self._instances
+
+        instances: List[InstanceMetadataTypeDef] = []
+        paginator = (await self._client()).get_paginator("list_instances")
+        async for page in paginator.paginate():
+            instances.extend(page.get("Instances", []))
+
+        self._instances = instances
+        return instances
+
+    async def list_permission_sets(self, instance_arn: str) -> Dict[str, str]:
+        index = get_permission_set_index(instance_arn)
+        if not index.complete:
+            await self._scan_permission_sets(instance_arn, index)
+        with index.lock:
+            return dict(index.names)
+
+    async def get_permission_set_arn(self, instance_arn: str, name: str) -> Optional[str]:
+        index = get_permission_set_index(instance_arn)
+        if name not in index.names and not index.complete:
+            await self._scan_permission_sets(instance_arn, index, stop_at=name)
+        with index.lock:
+            return index.names.get(name)
+
+    async def _describe_permission_set_name(self, instance_arn: str, permission_set_arn: str) -> str:
+        client = await self._client()
+        response = await client.describe_permission_set(InstanceArn=instance_arn, PermissionSetArn=permission_set_arn)
+        return response["PermissionSet"]["Name"]
+
+    async def _scan_permission_sets(
+        self, instance_arn: str, index: PermissionSetIndex, stop_at: Optional[str] = None
+    ) -> None:
+        """
+        Describe every permission set of a page at once, stopping after the page where `stop_at` was found
+        """
+        import asyncio
+
+        paginator = (await self._client()).get_paginator("list_permission_sets")
+        async for page in paginator.paginate(InstanceArn=instance_arn):
+            arns: List[str] = [arn for arn in page.get("PermissionSets", []) if arn not in index.arns]
+            names = await asyncio.gather(*(self._describe_permission_set_name(instance_arn, arn) for arn in arns))
+            # the index lock is never held across an await
+            with index.lock:
+                for name, arn in zip(names, arns):
+                    index.add(name, arn)
+            if stop_at and stop_at in index.names:
+                logger.debug(f"Found permission set {stop_at} after describing {len(index.arns)}")
+                return
+
+        index.complete = True
+        logger.debug(f"Indexed {len(index.names)} permission sets in {instance_arn}")
+
+    async def create_account_assignment(
         self,
         account_id: str,
         instance_arn: str,
         permission_set_arn: str,
         principal_id: str,
+        principal_type: "PrincipalTypeType" = "GROUP",
     ) -> Dict[str, Any]:
         try:
-            response = self.client.create_account_assignment(
+            response = await (await self._client()).create_account_assignment(
                 InstanceArn=instance_arn,
                 TargetId=account_id,
                 TargetType="AWS_ACCOUNT",
                 PermissionSetArn=permission_set_arn,
-                PrincipalType="GROUP",
+                PrincipalType=principal_type,
                 PrincipalId=principal_id,
             )
             return response["AccountAssignmentCreationStatus"]
         except botocore.exceptions.ClientError as error:
-            if error.response["Error"]["Code"] != "ConflictException":
-                logger.exception(f"Unable to add {permission_set_arn} to {principal_id} in {account_id}")
-                raise error
+            # includes a ConflictException still raised after the retries, the assignment fails and is retried
+            logger.exception(f"Unable to add {permission_set_arn} to {principal_id} in {account_id}")
+            raise error
 
-    def delete_account_assignment(
+    async def delete_account_assignment(
         self,
         account_id: str,
         instance_arn: str,
         permission_set_arn: str,
         principal_id: str,
-    ) -> Dict[str, Any]:
+        principal_type: "PrincipalTypeType" = "GROUP",
+    ) -> Optional[Dict[str, Any]]:
         try:
-            response = self.client.delete_account_assignment(
+            response = await (await self._client()).delete_account_assignment(
                 InstanceArn=instance_arn,
                 TargetId=account_id,
                 TargetType="AWS_ACCOUNT",
                 PermissionSetArn=permission_set_arn,
-                PrincipalType="GROUP",
+                PrincipalType=principal_type,
                 PrincipalId=principal_id,
             )
             return response["AccountAssignmentDeletionStatus"]
@@ -122,3 +680,161 @@ class SSO:
             if error.response["Error"]["Code"] != "ResourceNotFoundException":
                 logger.exception(f"Unable to delete {permission_set_arn} from {principal_id} in {account_id}")
                 raise error
+            return None
+
+    async def list_group_assignments(self, instance_arn: str, group_id: str) -> AsyncIterator[AccountAssignment]:
+        """
+        Yield every account assignment of a group
+        """
+        paginator = (await self._client()).get_paginator("list_account_assignments_for_principal")
+
+        assignments: List[AccountAssignment] = []
+        async for page in paginator.paginate(InstanceArn=instance_arn, PrincipalId=group_id, PrincipalType="GROUP"):
+            for item in page.get("AccountAssignments", []):
+                assignment = AccountAssignment(
+                    account_id=item["AccountId"],
+                    permission_set_arn=item["PermissionSetArn"],
+                    principal_id=group_id,
+                )
+                assignments.append(assignment)
+                yield assignment
+
+        get_assignment_index(instance_arn).load_principal(group_id, assignments)
+
+    async def list_assignments_in_account(self, instance_arn: str, account_id: str) -> List[AccountAssignment]:
+        """
+        Return every account assignment in an account, listing the permission sets provisioned to it at once
+        """
+        import asyncio
+
+        client = await self._client()
+        paginator = client.get_paginator("list_permission_sets_provisioned_to_account")
+        permission_set_arns: List[str] = []
+        async for page in paginator.paginate(InstanceArn=instance_arn, AccountId=account_id):
+            permission_set_arns.extend(page.get("PermissionSets", []))
+
+        async def list_assignments(permission_set_arn: str) -> List[AccountAssignment]:
+            paginator = client.get_paginator("list_account_assignments")
+            page_iterator = paginator.paginate(
+                InstanceArn=instance_arn, AccountId=account_id, PermissionSetArn=permission_set_arn
+            )
+            return [
+                AccountAssignment(
+                    account_id=account_id,
+                    permission_set_arn=permission_set_arn,
+                    principal_id=item["PrincipalId"],
+                    principal_type=item["PrincipalType"],
+                )
+                async for page in page_iterator
+                for item in page.get("AccountAssignments", [])
+            ]
+
+        results = await asyncio.gather(*(list_assignments(arn) for arn in permission_set_arns))
+        assignments = [assignment for result in results for assignment in result]
+
+        get_assignment_index(instance_arn).load_account(account_id, assignments)
+        return assignments
+
+    async def delete_group_assignments(self, instance_arn: str, group_id: str) -> AssignmentReport:
+        recorded = get_assignment_index(instance_arn).for_principal(group_id)
+        try:
+            listed = [assignment async for assignment in self.list_group_assignments(instance_arn, group_id)]
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise error
+            logger.warning(f"Unable to list the assignments of {group_id}, deleting the {len(recorded)} recorded")
+            listed = []
+        assignments = list(dict.fromkeys(listed + recorded))
+
+        logger.info(f"Deleting {len(assignments)} account assignments of {group_id}")
+        return await self.delete_account_assignments(instance_arn, assignments)
+
+    async def delete_assignments_in_account(self, instance_arn: str, account_id: str) -> AssignmentReport:
+        recorded = get_assignment_index(instance_arn).for_account(account_id)
+        listed = await self.list_assignments_in_account(instance_arn, account_id)
+        assignments = list(dict.fromkeys(listed + recorded))
+
+        logger.info(f"Deleting {len(assignments)} account assignments in {account_id}")
+        return await self.delete_account_assignments(instance_arn, assignments)
+
+    async def create_account_assignments(
+        self, instance_arn: str, assignments: Iterable[AccountAssignment]
+    ) -> AssignmentReport:
+        """
+        Submit every assignment at once and wait until each one reaches a final state
+        """
+        return await self._apply_account_assignments(instance_arn, assignments, CREATE)
+
+    async def delete_account_assignments(
+        self, instance_arn: str, assignments: Iterable[AccountAssignment]
+    ) -> AssignmentReport:
+        """
+        Delete every assignment at once and wait until each one reaches a final state
+        """
+        return await self._apply_account_assignments(instance_arn, assignments, DELETE)
+
+    async def _apply_account_assignments(
+        self, instance_arn: str, assignments: Iterable[AccountAssignment], action: str
+    ) -> AssignmentReport:
+        import asyncio
+
+        results = list(
+            await asyncio.gather(
+                *(self._submit_account_assignment(instance_arn, action, assignment) for assignment in assignments)
+            )
+        )
+        await self._wait_for_account_assignments(instance_arn, results)
+
+        return _record_results(instance_arn, results, action)
+
+    async def _submit_account_assignment(
+        self, instance_arn: str, action: str, assignment: AccountAssignment
+    ) -> AssignmentResult:
+        submit = self.create_account_assignment if action == CREATE else self.delete_account_assignment
+        try:
+            status = await submit(
+                account_id=assignment.account_id,
+                instance_arn=instance_arn,
+                permission_set_arn=assignment.permission_set_arn,
+                principal_id=assignment.principal_id,
+                principal_type=assignment.principal_type,
+            )
+        except botocore.exceptions.ClientError as error:
+            return AssignmentResult(assignment, FAILED, action=action, failure_reason=str(error))
+
+        return _submitted(assignment, action, status)
+
+    async def _wait_for_account_assignments(self, instance_arn: str, results: List[AssignmentResult]) -> None:
+        """
+        Poll every pending assignment at once, backing off between rounds
+        """
+        import asyncio
+
+        delay = STATUS_POLL_DELAY
+        timeout = time.monotonic() + STATUS_POLL_TIMEOUT
+
+        pending = [result for result in results if result.status == IN_PROGRESS]
+        while pending:
+            if not _can_wait(timeout, delay):
+                logger.warning(f"Stopped waiting for {len(pending)} account assignments still in progress")
+                return
+
+            await asyncio.sleep(delay)
+            await asyncio.gather(*(self._update_account_assignment_status(instance_arn, result) for result in pending))
+
+            pending = [result for result in pending if result.status == IN_PROGRESS]
+            delay = min(delay * 2, MAX_STATUS_POLL_DELAY)
+
+    async def _update_account_assignment_status(self, instance_arn: str, result: AssignmentResult) -> None:
+        operation_name, request_id_key, status_key = _STATUS_OPERATIONS[result.action]
+        try:
+            response = await getattr(await self._client(), operation_name)(
+                InstanceArn=instance_arn, **{request_id_key: result.request_id}
+            )
+        except botocore.exceptions.ClientError:
+            logger.exception(f"Unable to describe account assignment request {result.request_id}")
+            return
+
+        status = response[status_key]
+        result.status = status["Status"]
+        result.failure_reason = status.get("FailureReason")
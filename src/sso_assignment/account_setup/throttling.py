@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+* Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+* SPDX-License-Identifier: MIT-0
+*
+* Permission is hereby granted, free of charge, to any person obtaining a copy of this
+* software and associated documentation files (the "Software"), to deal in the Software
+* without restriction, including without limitation the rights to use, copy, modify,
+* merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+* permit persons to whom the Software is furnished to do so.
+*
+* THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+* INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+* PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+* HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+* OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+* SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+logger = Logger(child=True)
+
+__all__ = ["RATE_LIMITER", "RateLimiter", "TokenBucket", "remaining_time", "set_deadline"]
+
+# requests per second allowed for each operation until throttling is observed
+DEFAULT_RATE = 20.0
+
+# operations with lower documented or observed limits, keyed by "<service-id>.<OperationName>"
+OPERATION_RATES: Dict[str, float] = {
+    "ecs.PutAccountSettingDefault": 5.0,
+    "servicecatalog.AssociatePrincipalWithPortfolio": 5.0,
+    "servicecatalog.DisassociatePrincipalFromPortfolio": 5.0,
+    "sso-admin.CreateAccountAssignment": 10.0,
+    "sso-admin.DeleteAccountAssignment": 10.0,
+}
+
+MIN_RATE = 0.5
+
+MAX_ATTEMPTS = 8
+BASE_DELAY = 0.2  # seconds
+MAX_DELAY = 10.0  # seconds
+
+# time kept in reserve at the end of an invocation so errors are still reported
+DEADLINE_MARGIN = 2.0  # seconds
+
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "TransactionInProgressException",
+    "RequestLimitExceeded",
+    "BandwidthLimitExceeded",
+    "LimitExceededException",
+    "RequestThrottled",
+    "SlowDown",
+    "PriorRequestNotComplete",
+    "EC2ThrottledException",
+}
+
+TRANSIENT_ERROR_CODES = {
+    "RequestTimeout",
+    "RequestTimeoutException",
+    "InternalError",
+    "InternalFailure",
+    "InternalServerException",
+    "ServiceUnavailable",
+    "ServiceUnavailableException",
+}
+
+# errors only transient for some operations, keyed like OPERATION_RATES
+OPERATION_ERROR_CODES: Dict[str, Set[str]] = {
+    # another change to the same account and permission set has not propagated yet
+    "sso-admin.CreateAccountAssignment": {"ConflictException"},
+    "sso-admin.DeleteAccountAssignment": {"ConflictException"},
+}
+
+_deadline: Optional[float] = None
+
+
+def set_deadline(context: LambdaContext) -> None:
+    """
+    Stop retrying shortly before the invocation runs out of time
+    """
+    global _deadline
+    _deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Seconds left before the deadline, or None outside of an invocation
+    """
+    if _deadline is None:
+        return None
+    return _deadline - time.monotonic()
+
+
+class TokenBucket:
+    """
+    Token bucket whose rate halves on every throttle and recovers gradually on success
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> float:
+        # allow bursts of one second worth of requests, and at least one request
+        return max(1.0, self.rate)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self) -> Optional[float]:
+        """
+        Take a token, or return the seconds to wait before trying again
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate
+
+    def _wait(self) -> Optional[float]:
+        """
+        Take a token or return the seconds to wait, failing when the wait would run past the deadline
+        """
+        wait = self._take()
+        if wait is not None:
+            time_left = remaining_time()
+            if time_left is not None and time_left < wait:
+                raise TimeoutError("Timed out waiting for the rate limit")
+        return wait
+
+    def acquire(self) -> None:
+        wait = self._wait()
+        while wait is not None:
+            time.sleep(wait)
+            wait = self._wait()
+
+    async def acquire_async(self) -> None:
+        import asyncio
+
+        wait = self._wait()
+        while wait is not None:
+            await asyncio.sleep(wait)
+            wait = self._wait()
+
+    def throttled(self) -> None:
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class RateLimiter:
+    """
+    Process-wide token buckets per service, region and operation, shared by every client and thread
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[Tuple[str, Optional[str], str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, service_id: str, region_name: Optional[str], operation_name: str) -> TokenBucket:
+        key = (service_id, region_name, operation_name)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(OPERATION_RATES.get(f"{service_id}.{operation_name}", DEFAULT_RATE))
+                self._buckets[key] = bucket
+            return bucket
+
+    def register(self, client: Any) -> None:
+        """
+        Rate limit every attempt made by a client and take over its retries
+
+        The client must be created with botocore retries disabled (total_max_attempts=1).
+        """
+        service_id = client.meta.service_model.service_id.hyphenize()
+        region_name = client.meta.region_name
+
+        def before_send(event_name: str, **kwargs: Any) -> None:
+            operation_name = event_name.rsplit(".", 1)[-1]
+            self.bucket(service_id, region_name, operation_name).acquire()
+
+        client.meta.events.register(f"before-send.{service_id}", before_send)
+        client.meta.events.register_first(f"needs-retry.{service_id}", self._retry_handler(service_id, region_name))
+
+    def register_async(self, client: Any) -> None:
+        """
+        Same as register for aiobotocore clients, waiting for a token without blocking the event loop
+        """
+        service_id = client.meta.service_model.service_id.hyphenize()
+        region_name = client.meta.region_name
+
+        async def before_send(event_name: str, **kwargs: Any) -> None:
+            operation_name = event_name.rsplit(".", 1)[-1]
+            await self.bucket(service_id, region_name, operation_name).acquire_async()
+
+        client.meta.events.register(f"before-send.{service_id}", before_send)
+        client.meta.events.register_first(f"needs-retry.{service_id}", self._retry_handler(service_id, region_name))
+
+    def _retry_handler(self, service_id: str, region_name: Optional[str]) -> Callable[..., Optional[float]]:
+        def needs_retry(
+            attempts: int,
+            operation: Any,
+            response: Optional[Tuple[Any, Dict[str, Any]]] = None,
+            caught_exception: Optional[Exception] = None,
+            **kwargs: Any,
+        ) -> Optional[float]:
+            if isinstance(caught_exception, TimeoutError):
+                # raised by the rate limiter, the deadline is too close for another attempt
+                logger.warning(f"Not retrying {service_id}:{operation.name}, the invocation is running out of time")
+                return None
+
+            bucket = self.bucket(service_id, region_name, operation.name)
+
+            code = ""
+            if response is not None:
+                code = response[1].get("Error", {}).get("Code") or ""
+                status_code = response[1].get("ResponseMetadata", {}).get("HTTPStatusCode", 200)
+                if not code and status_code < 500:
+                    bucket.succeeded()
+                    return None
+                if not code:
+                    code = str(status_code)
+
+            if code in THROTTLING_ERROR_CODES:
+                bucket.throttled()
+            elif (
+                caught_exception is None
+                and code not in TRANSIENT_ERROR_CODES
+                and code not in OPERATION_ERROR_CODES.get(f"{service_id}.{operation.name}", ())
+                and not code.startswith("5")
+            ):
+                return None
+
+            if attempts >= MAX_ATTEMPTS:
+                return None
+
+            # full jitter
+            delay = random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2**attempts))
+            if _deadline is not None and time.monotonic() + delay > _deadline:
+                logger.warning(f"Not retrying {service_id}:{operation.name}, the invocation is running out of time")
+                return None
+
+            logger.debug(f"Retrying {service_id}:{operation.name} after {code or caught_exception} in {delay:.2f}s")
+            return delay
+
+        return needs_retry
+
+
+# shared by every client in the execution environment
+RATE_LIMITER = RateLimiter()
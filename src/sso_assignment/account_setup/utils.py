@@ -45,8 +45,8 @@ def parse_group(group_name: str) -> Tuple[Optional[str], str]:
     # ex. AWS-A-AccountA-DeveloperAccess
     if group_name.startswith(GROUP_ACCOUNT_PREFIX):
         group_parts = group_name.replace(GROUP_ACCOUNT_PREFIX, "").rsplit("-", 1)
-        account_name = group_parts[2]  # AccountA
-        permission_set_name = group_parts[3]  # DeveloperAccess
+        account_name = group_parts[0]  # AccountA
+        permission_set_name = group_parts[1]  # DeveloperAccess
 
     # ex. AWS-O-AWSReadOnlyAccess
     elif group_name.startswith(GROUP_ORG_PREFIX):